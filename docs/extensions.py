@@ -36,6 +36,9 @@ MANPAGE_REDIRECTS = {
     'tk_getSaveFile': 'tk_getOpenFile',
 }
 
+# manual pages that have an underscore in the url
+UNDERSCORE_MANPAGES = {'re_syntax'}
+
 
 def get_manpage_url(manpage_name, tcl_or_tk):
     manpage_name = MANPAGE_REDIRECTS.get(manpage_name, manpage_name)
@@ -45,8 +48,9 @@ def get_manpage_url(manpage_name, tcl_or_tk):
     is_c_function = manpage_name.startswith(tcl_or_tk.capitalize() + '_')
 
     # ik, this is weird
-    if manpage_name.startswith('ttk_'):
-        # ttk_separator --> ttk_separator
+    if (manpage_name.startswith('ttk_') or
+            manpage_name in UNDERSCORE_MANPAGES):
+        # ttk_separator --> ttk_separator, re_syntax --> re_syntax
         name_part = manpage_name
     else:
         # tk_chooseColor --> chooseColor
@@ -36,7 +36,8 @@ from teek._structures import (
 from teek._tcl_calls import (
     tcl_call, tcl_eval, create_command, delete_command, run, quit, update,
     init_threads, make_thread_safe)
-from teek._timeouts import after, after_idle
+from teek._timeouts import (
+    after, after_idle, every, debounce, throttle, spawn)
 from teek._widgets.base import Widget
 from teek._widgets.menu import Menu, MenuItem
 from teek._widgets.misc import (
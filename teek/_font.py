@@ -1,14 +1,63 @@
+import collections
 import itertools
 
 import teek as tk
+from teek._structures import after_quit, before_quit
+from teek._tcl_calls import to_tcl
 
 flatten = itertools.chain.from_iterable
 
+# font actual and font metrics don't change unless fonts are reconfigured, so
+# they are cached here, and the caches are cleared when tk says that fonts
+# changed or a named font is configured through teek
+_font_caches = {}       # {font description: {'actual': dict, ...}}
+_families_cache = []
+_root_bindings = None   # a BindingDict for the '.' root window
+_root_binding_commands = []
 
-def _font_property(type_spec, option):
+
+def _clear_font_caches():
+    _font_caches.clear()
+    _families_cache.clear()
+
+
+# this runs before quitting, because deleting commands after quitting would
+# create a new interpreter
+def _delete_root_bindings():
+    global _root_bindings
+    for command in _root_binding_commands:
+        tk.delete_command(command)
+    _root_binding_commands.clear()
+    _root_bindings = None
+
+
+after_quit.connect(_clear_font_caches)
+before_quit.connect(_delete_root_bindings)
+
+
+def _get_font_cache(font):
+    global _root_bindings
+    if _root_bindings is None:
+        # importing this at the top would be a circular import
+        from teek._widgets.base import BindingDict
+
+        # tk sends <<TkWorldChanged>> to all widgets, including '.', when
+        # e.g. a named font changes or the font scaling changes
+        _root_bindings = BindingDict(
+            lambda returntype, *args: tk.tcl_call(
+                returntype, 'bind', '.', *args),
+            _root_binding_commands)
+        _root_bindings['<<TkWorldChanged>>'].connect(
+            lambda event: _clear_font_caches())
+
+    # the description can be a list, but to_tcl() gives a hashable tuple
+    return _font_caches.setdefault(to_tcl(font._font_description), {})
+
+
+def _font_property(option):
 
     def getter(self):
-        return tk.tcl_call(type_spec, "font", "actual", self, "-" + option)
+        return self._get_actual()[option]
 
     def setter(self, value):
         if not isinstance(self, NamedFont):
@@ -16,10 +65,26 @@ def _font_property(type_spec, option):
                 "cannot change options of non-named fonts, but you can use "
                 "the_font.to_named_font() to create a mutable font object")
         tk.tcl_call(None, "font", "configure", self, "-" + option, value)
+        _font_caches.pop(self._font_description, None)
 
     return property(getter, setter)
 
 
+# -displayof is needed, because otherwise strings that start with '-d' would
+# be treated as options
+_MEASURE_MANY_LAMBDA = '''{font strings} {
+    set result {}
+    foreach string $strings {
+        lappend result [font measure $font -displayof . $string]
+    }
+    return $result
+}'''
+_MEASURE_CACHE_SIZE = 10000
+
+_ACTUAL_TYPES = {"-family": str, "-size": int, "-weight": str, "-slant": str,
+                 "-underline": bool, "-overstrike": bool}
+
+
 def _anonymous_font_new_helper(font_description):
     # magic: Font(a_font_name) returns a NamedFont
     # is the font description a font name? configure works only with
@@ -80,12 +145,12 @@ class Font:
         # the _font_description of NamedFont is the font name
         self._font_description = font_description
 
-    family = _font_property(str, 'family')
-    size = _font_property(int, 'size')
-    weight = _font_property(str, 'weight')
-    slant = _font_property(str, 'slant')
-    underline = _font_property(bool, 'underline')
-    overstrike = _font_property(bool, 'overstrike')
+    family = _font_property('family')
+    size = _font_property('size')
+    weight = _font_property('weight')
+    slant = _font_property('slant')
+    underline = _font_property('underline')
+    overstrike = _font_property('overstrike')
 
     def __repr__(self):
         return '%s(%r)' % (type(self).__name__, self._font_description)
@@ -114,12 +179,78 @@ class Font:
         """
         return self._font_description
 
-    def measure(self, text):
+    def measure(self, text, *, cache=False):
         """
         Calls ``font measure`` documented in :man:`font(3tk)`, and returns an
         integer.
+
+        See :meth:`measure_many` for the ``cache`` argument.
         """
-        return tk.tcl_call(int, "font", "measure", self, text)
+        return self.measure_many([text], cache=cache)[0]
+
+    def measure_many(self, strings, *, cache=False):
+        """Measure many strings like :meth:`measure` and return a list of ints.
+
+        All strings are measured with one Tcl call, so this is a lot faster
+        than calling :meth:`measure` for each string:
+
+        >>> font = tk.Font('Helvetica 12')
+        >>> font.measure_many(['a', 'hello', 'hello world'])  # doctest: +SKIP
+        [7, 34, 77]
+
+        If ``cache`` is True, the widths are remembered, and strings measured
+        before with the same font and ``cache=True`` are not measured again.
+        The cache is cleared like the cache of :meth:`actual`, and only the
+        most recently used widths are kept if there are many strings.
+        """
+        strings = list(strings)
+        if not cache:
+            return tk.tcl_call([int], 'apply', _MEASURE_MANY_LAMBDA,
+                               self, strings)
+
+        widths = _get_font_cache(self).setdefault(
+            'measure', collections.OrderedDict())
+        missing = [string for string in collections.OrderedDict.fromkeys(
+            strings) if string not in widths]
+        if missing:
+            widths.update(zip(missing, tk.tcl_call(
+                [int], 'apply', _MEASURE_MANY_LAMBDA, self, missing)))
+
+        result = []
+        for string in strings:
+            widths.move_to_end(string)
+            result.append(widths[string])
+
+        while len(widths) > _MEASURE_CACHE_SIZE:
+            widths.popitem(last=False)
+        return result
+
+    def _get_actual(self):
+        cache = _get_font_cache(self)
+        try:
+            return cache['actual']
+        except KeyError:
+            result = tk.tcl_call(_ACTUAL_TYPES, "font", "actual", self)
+            cache['actual'] = {name.lstrip('-'): value
+                               for name, value in result.items()}
+            return cache['actual']
+
+    def actual(self):
+        """Returns the values of all attributes listed above as a dictionary.
+
+        This calls ``font actual`` documented in :man:`font(3tk)`. For
+        example:
+
+        >>> tk.Font('Helvetica 12 bold').actual()      # doctest: +SKIP
+        {'family': 'Nimbus Sans L', 'size': 12, 'weight': 'bold', \
+'slant': 'roman', 'underline': False, 'overstrike': False}
+
+        The result is cached, so the attributes of a font are looked up from
+        Tk only once. The cache is cleared when a :class:`.NamedFont` is
+        changed with teek, or when Tk sends a ``<<TkWorldChanged>>`` virtual
+        event; Tk does that when fonts change in some other way.
+        """
+        return self._get_actual().copy()
 
     def metrics(self):
         """
@@ -129,12 +260,18 @@ class Font:
         * The values of ``'ascent'``, ``'descent'`` and ``'linespace'`` are
           integers.
         * The value of ``'fixed'`` is True or False.
+
+        The result is cached like with :meth:`actual`.
         """
-        result = tk.tcl_call(
-            {"-ascent": int, "-descent": int,
-             "-linespace": int, "-fixed": bool},
-            "font", "metrics", self)
-        return {name.lstrip('-'): value for name, value in result.items()}
+        cache = _get_font_cache(self)
+        if 'metrics' not in cache:
+            result = tk.tcl_call(
+                {"-ascent": int, "-descent": int,
+                 "-linespace": int, "-fixed": bool},
+                "font", "metrics", self)
+            cache['metrics'] = {name.lstrip('-'): value
+                                for name, value in result.items()}
+        return cache['metrics'].copy()
 
     def to_named_font(self):
         """Returns a :class:`.NamedFont` object created from this font.
@@ -142,9 +279,7 @@ class Font:
         If this font is already a :class:`.NamedFont`, a copy of it is created
         and returned.
         """
-        options = tk.tcl_call({}, 'font', 'actual', self)
-        kwargs = {name.lstrip('-'): value for name, value in options.items()}
-        return NamedFont(**kwargs)
+        return NamedFont(**self.actual())
 
     @classmethod
     def families(self, *, allow_at_prefix=False):
@@ -155,8 +290,12 @@ class Font:
         tkinter users (including me) ignore those, so this method ignores them
         by default. Pass ``allow_at_prefix=True`` to get a list that includes
         the ``'@'`` fonts.
+
+        The list of families is cached like with :meth:`actual`.
         """
-        result = tk.tcl_call([str], "font", "families")
+        if not _families_cache:
+            _families_cache.extend(tk.tcl_call([str], "font", "families"))
+        result = list(_families_cache)
         if allow_at_prefix:
             return result
         return [family for family in result if not family.startswith('@')]
@@ -209,6 +348,8 @@ class NamedFont(Font):
                             *options_with_dashes)
 
         super().__init__(name)
+        if kwargs:
+            _font_caches.pop(name, None)
 
     # __repr__, __eq__, __hash__, and event to_named_font, {from,to}_tcl are
     # fine, to_named_font creates a copy of this font
@@ -227,3 +368,4 @@ class NamedFont(Font):
         :exc:`.TclError`.
         """
         tk.tcl_call(None, "font", "delete", self)
+        _font_caches.pop(self._font_description, None)
@@ -1,11 +1,13 @@
 import abc
-import base64
 import collections.abc
 import functools
 import itertools
 import os
+import re
+import struct
 import sys
 import traceback
+import zlib
 
 import teek as tk
 from teek._tcl_calls import make_thread_safe
@@ -142,13 +144,79 @@ before_quit = Callback()
 after_quit = Callback()
 
 
+# {key: dict}, see ConfigDict._share_types()
+_shared_type_dicts = {}
+
+
+# a dict of {option: type spec} that can share its content with other type
+# tables, because e.g. all Button widgets have the same option types and there
+# may be thousands of buttons
+#
+# setting a value copies the dict first if it's shared, unless the new value
+# is equal to the value that's already there, so running the same .update()
+# for every object with a shared table doesn't copy anything
+class _TypeTable(collections.abc.MutableMapping):
+
+    __slots__ = ('_dict', '_shared')
+
+    def __init__(self, shared_dict=None):
+        if shared_dict is None:
+            self._dict = {}
+            self._shared = False
+        else:
+            self._dict = shared_dict
+            self._shared = True
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self._dict)
+
+    # returns a dict that can be passed to _TypeTable(), and makes this
+    # table copy it before changing it
+    def share(self):
+        self._shared = True
+        return self._dict
+
+    def _copy_if_shared(self):
+        if self._shared:
+            self._dict = self._dict.copy()
+            self._shared = False
+
+    def __getitem__(self, option):
+        return self._dict[option]
+
+    # Mapping.get() would be slower, and this is called a lot
+    def get(self, option, default=None):
+        return self._dict.get(option, default)
+
+    def __contains__(self, option):
+        return option in self._dict
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __setitem__(self, option, type_spec):
+        if option in self._dict and self._dict[option] == type_spec:
+            return
+        self._copy_if_shared()
+        self._dict[option] = type_spec
+
+    def __delitem__(self, option):
+        self._copy_if_shared()
+        del self._dict[option]
+
+
 class ConfigDict(collections.abc.MutableMapping):
 
+    __slots__ = ('_types', '_special', '_special_values')
+
     def __init__(self):
         # {option: type spec}
         # use .get(option, str), this is not a defaultdict because it tests
         # search for options not in this
-        self._types = {}
+        self._types = _TypeTable()
 
         # {option: function called with 0 args that returns the value}
         self._special = {}
@@ -159,6 +227,19 @@ class ConfigDict(collections.abc.MutableMapping):
     def __repr__(self):
         return '<a config object, behaves like a dict>'
 
+    # makes this config object use the same types as other config objects
+    # with the same key, so that they aren't stored many times in memory
+    #
+    # setup_func should set the types in self._types, it's called every time
+    # because it may do other things as well
+    def _share_types(self, key, setup_func):
+        shared_dict = _shared_type_dicts.get(key)
+        if shared_dict is not None:
+            self._types = _TypeTable(shared_dict)
+        setup_func()
+        if shared_dict is None:
+            _shared_type_dicts[key] = self._types.share()
+
     def __call__(self, *args, **kwargs):
         raise TypeError("use widget.config['option'] = value, "
                         "not widget.config(option=value)")
@@ -232,6 +313,8 @@ class ConfigDict(collections.abc.MutableMapping):
 
 class CgetConfigureConfigDict(ConfigDict):
 
+    __slots__ = ('_caller_func',)
+
     def __init__(self, caller_func):
         super().__init__()
         self._caller_func = caller_func
@@ -248,6 +331,37 @@ class CgetConfigureConfigDict(ConfigDict):
         return (info[0].lstrip('-') for info in infos)
 
 
+_HEX_COLOR_REGEX = re.compile(r'#([0-9A-Fa-f]{6}|[0-9A-Fa-f]{12})')
+_color_name_rgbs = {}     # {color string: (r, g, b)}
+
+
+def _parse_color_string(color_string):
+    # '#rrggbb' and '#rrrrggggbbbb' mean the same thing everywhere, but e.g.
+    # '#rgb' means '#r0g0b0' on x11 and '#rrggbb' on other platforms, so
+    # strings like that and color names are looked up with tk
+    if (isinstance(color_string, str) and
+            _HEX_COLOR_REGEX.fullmatch(color_string) is not None):
+        size = (len(color_string) - 1) // 3
+        return tuple(int(color_string[start:start + 2], 16)
+                     for start in range(1, len(color_string), size))
+
+    try:
+        return _color_name_rgbs[color_string]
+    except KeyError:
+        pass
+
+    # any widget will do, i'm using the '.' root window because it
+    # always exists
+    rgb = tk.tcl_call([int], 'winfo', 'rgb', '.', color_string)
+
+    # tk uses 16-bit colors for some reason, but most people are more
+    # familiar with 8-bit colors so we'll shift away the "useless" bits
+    result = tuple(value >> 8 for value in rgb)
+    assert len(result) == 3
+    _color_name_rgbs[color_string] = result
+    return result
+
+
 class Color:
     """Represents an RGB color.
 
@@ -270,9 +384,10 @@ class Color:
         >>> Color('white')     # 'white' is a Tk color name
         <Color 'white': red=255, green=255, blue=255>
 
-    The string argument things are implemented by letting Tk interpret the
-    color, so all of the ways to define colors as strings shown in
-    :man:`Tk_GetColor(3tk)` are supported.
+    Strings like ``'#rrggbb'`` and ``'#rrrrggggbbbb'`` are parsed in Python.
+    Other strings are interpreted by Tk, so all of the ways to define colors as
+    strings shown in :man:`Tk_GetColor(3tk)` are supported. Tk is asked only
+    once for each string, and the result is cached.
 
     Color objects are hashable, and they can be compared with ``==``::
 
@@ -300,28 +415,25 @@ class Color:
         Assigning to these like ``some_color.red = 255`` raises an exception.
     """
 
+    __slots__ = ('_color_string', '_rgb')
+
     def __init__(self, *args):
         if len(args) == 3:
             for name, value in zip(['red', 'green', 'blue'], args):
                 if value not in range(256):
                     raise ValueError("invalid %s value: %r" % (name, value))
             self._color_string = '#%02x%02x%02x' % args
-        elif len(args) == 1:
+            self._rgb = tuple(args)
+            return
+
+        if len(args) == 1:
             self._color_string = args[0]
+            self._rgb = _parse_color_string(self._color_string)
         else:
             # python raises TypeError for wrong number of arguments
             raise TypeError("use {0}(red, green, blue) or {0}(color_string)"
                             .format(type(self).__name__))
 
-        # any widget will do, i'm using the '.' root window because it
-        # always exists
-        rgb = tk.tcl_call([int], 'winfo', 'rgb', '.', self._color_string)
-
-        # tk uses 16-bit colors for some reason, but most people are more
-        # familiar with 8-bit colors so we'll shift away the "useless" bits
-        self._rgb = tuple(value >> 8 for value in rgb)
-        assert len(self._rgb) == 3
-
     def __repr__(self):
         return '<%s %r: red=%d, green=%d, blue=%d>' % (
             type(self).__name__, self._color_string,
@@ -332,9 +444,12 @@ class Color:
         """``Color.from_tcl(color_string)`` returns ``Color(color_string)``.
 
         This is just for compatibility with
-        :ref:`type specifications <type-spec>`.
+        :ref:`type specifications <type-spec>`. Color objects are immutable,
+        so this returns the same object when called many times with the same
+        string; for example, reading the ``foreground`` of many text widget
+        tags that use the same color gives just one color object.
         """
-        return cls(color_string)
+        return _color_from_string(cls, color_string)
 
     red = property(lambda self: self._rgb[0])
     green = property(lambda self: self._rgb[1])
@@ -370,6 +485,12 @@ class Color:
         return hash(self._rgb)
 
 
+# color objects are immutable, so the same object can be returned for the same
+# color string many times
+_color_from_string = functools.lru_cache(maxsize=1024)(
+    lambda color_class, color_string: color_class(color_string))
+
+
 class TclVariable:
     """Represents a global Tcl variable.
 
@@ -485,6 +606,26 @@ class FloatVar(TclVariable): type_spec = float      # flake8: noqa
 class BooleanVar(TclVariable): type_spec = bool     # flake8: noqa
 
 
+# a number like tk's strtod() parses it, and an optional unit
+_SCREEN_DISTANCE_REGEX = re.compile(
+    r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*([cimp]?)\s*',
+    re.ASCII)
+_pixels_per_unit = {}       # {unit: float}
+after_quit.connect(_pixels_per_unit.clear)
+
+_PIXELS_PER_UNIT_LAMBDA = '''{} {
+    list [winfo fpixels . 1c] [winfo fpixels . 1i] \\
+         [winfo fpixels . 1m] [winfo fpixels . 1p]
+}'''
+
+
+def _get_pixels_per_unit():
+    if not _pixels_per_unit:
+        values = tk.tcl_call([float], 'apply', _PIXELS_PER_UNIT_LAMBDA)
+        _pixels_per_unit.update(zip('cimp', values))
+    return _pixels_per_unit
+
+
 @functools.total_ordering
 class ScreenDistance:
     """Represents a Tk screen distance.
@@ -508,24 +649,51 @@ class ScreenDistance:
 
         The number of pixels that this screen distance represents as an int.
 
-        This is implemented with ``winfo pixels``, documented in
+        This is :attr:`fpixels` rounded like ``winfo pixels`` rounds, see
         :man:`winfo(3tk)`.
 
     .. attribute:: fpixels
 
         The number of pixels that this screen distance represents as a float.
 
-        This is implemented with ``winfo fpixels``, documented in
-        :man:`winfo(3tk)`.
+        This is calculated like ``winfo fpixels`` does, documented in
+        :man:`winfo(3tk)`. Tk is asked how many pixels a centimeter, an inch,
+        a millimeter and a point are only once, and the results are cached, so
+        creating screen distance objects and using this attribute usually
+        doesn't involve any Tcl calls.
     """
 
+    __slots__ = ('_value', '_number', '_unit', '_fpixels')
+
     def __init__(self, value):
         self._value = str(value)
+        self._fpixels = None
+
+        match = _SCREEN_DISTANCE_REGEX.fullmatch(self._value)
+        if match is None:
+            # let tk handle everything else; creating a ScreenDistance object
+            # must fail if the screen distance is invalid
+            self._fpixels = tk.tcl_call(
+                float, 'winfo', 'fpixels', '.', self._value)
+        else:
+            number, self._unit = match.groups()
+            self._number = float(number)
+            if not self._unit:
+                self._fpixels = self._number
 
-        # creating a ScreenDistance object must fail if the screen distance
-        # is invalid, that's why this is here
-        self.pixels = tk.tcl_call(int, 'winfo', 'pixels', '.', self._value)
-        self.fpixels = tk.tcl_call(float, 'winfo', 'fpixels', '.', self._value)
+    @property
+    def fpixels(self):
+        if self._fpixels is None:
+            self._fpixels = self._number * _get_pixels_per_unit()[self._unit]
+        return self._fpixels
+
+    @property
+    def pixels(self):
+        # tk rounds like this, e.g. 'winfo pixels . -1.5' returns -2
+        fpixels = self.fpixels
+        if fpixels < 0:
+            return int(fpixels - 0.5)
+        return int(fpixels + 0.5)
 
     def __repr__(self):
         return '%s(%r)' % (type(self).__name__, self._value)
@@ -558,12 +726,60 @@ class ScreenDistance:
         return self._value
 
 
+_IMAGE_TYPES = {
+    'data': str,
+    'format': str,
+    'file': str,
+    'gamma': float,
+    'width': int,
+    'height': int,
+    'palette': str,
+}
+
+
 def _options(kwargs):
     for name, value in kwargs.items():
         yield ('-from' if name == 'from_' else '-' + name)
         yield value
 
 
+_HEX_COLOR_JUNK = str.maketrans('', '', '{}# ')
+_ALPHA_BYTES = bytes.maketrans(b'01', b'\xff\x00')
+
+# returns a string with 1 for each transparent pixel and 0 for other pixels
+_TRANSPARENCY_LAMBDA = '''{image x1 y1 x2 y2} {
+    set result ""
+    for {set y $y1} {$y < $y2} {incr y} {
+        for {set x $x1} {$x < $x2} {incr x} {
+            append result [$image transparency get $x $y]
+        }
+    }
+    return $result
+}'''
+
+
+def _png_chunk(chunk_type, data):
+    return b''.join([struct.pack('>I', len(data)), chunk_type, data,
+                     struct.pack('>I', zlib.crc32(chunk_type + data))])
+
+
+# tk can't read raw rgba data, but it can read png, and a png is just a zlib
+# compressed list of rows with a filter type byte in front of each row
+def _png_bytes(rgba_pixels, width, height):
+    row_size = width * 4
+    rows = b''.join(
+        b'\x00' + rgba_pixels[start:start + row_size]
+        for start in range(0, row_size * height, row_size))
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        # 8 bits per channel, color type 6 means rgba
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6,
+                                        0, 0, 0)),
+        _png_chunk(b'IDAT', zlib.compress(rows, 1)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
 class Image:
     """Represents a Tk photo image.
 
@@ -585,10 +801,10 @@ class Image:
     ``image create photo`` followed by the options in Tcl. See
     :man:`image(3tk)` for details.
 
-    Keyword arguments are passed as options to :man:`photo(3tk)` as usual,
-    except that if a ``data`` keyword argument is given, it should be a
-    :class:`bytes` object of data that came from e.g. an image file opened with
-    ``'rb'``; it will be automatically converted to base64.
+    Keyword arguments are passed as options to :man:`photo(3tk)` as usual.
+    If a ``data`` keyword argument is given, it should be a :class:`bytes`
+    object of data that came from e.g. an image file opened with ``'rb'``. It's
+    passed to Tk as binary data, without converting it to base64 first.
 
     Image objects can be compared with ``==``, and they compare equal if they
     represent the same Tk image; that is, ``image1 == image2`` returns
@@ -600,9 +816,6 @@ class Image:
     """
 
     def __init__(self, **kwargs):
-        if 'data' in kwargs:
-            kwargs['data'] = base64.b64encode(kwargs['data']).decode('ascii')
-
         if 'file' in kwargs:
             self._repr_info = 'from %r, ' % (kwargs['file'],)
         else:
@@ -615,15 +828,7 @@ class Image:
         self._name = name
         self.config = CgetConfigureConfigDict(
             lambda returntype, *args: tk.tcl_call(returntype, self, *args))
-        self.config._types.update({
-            'data': str,
-            'format': str,
-            'file': str,
-            'gamma': float,
-            'width': int,
-            'height': int,
-            'palette': str,
-        })
+        self.config._types = _TypeTable(_IMAGE_TYPES)
 
     @classmethod
     def from_tcl(cls, name):
@@ -731,13 +936,155 @@ class Image:
         """See :attr:`width`."""
         return tk.tcl_call(int, 'image', 'height', self)
 
-    # TODO: data and put methods, will be hard because passing around binary
-
     def get(self, x, y):
-        """Returns the :class:`.Color` of the pixel at (x,y)."""
+        """Returns the :class:`.Color` of the pixel at (x,y).
+
+        Use :meth:`get_pixels` if you need many pixels; calling this for each
+        pixel is slow.
+        """
         r, g, b = tk.tcl_call([int], self, 'get', x, y)
         return Color(r, g, b)
 
+    def _region(self, region):
+        if region is None:
+            return (0, 0, self.width, self.height)
+        x1, y1, x2, y2 = region
+        if not (0 <= x1 <= x2 and 0 <= y1 <= y2):
+            raise ValueError("invalid region: %r" % (region,))
+        return (x1, y1, x2, y2)
+
+    def get_pixels(self, region=None, *, alpha=False):
+        """Return the colors of many pixels as a :class:`bytes` object.
+
+        The ``region`` should be an ``(x1, y1, x2, y2)`` tuple. The pixels
+        returned include the left and top edges of the region, but not the
+        right and bottom edges, so e.g. ``(0, 0, 2, 1)`` means 2 pixels. By
+        default, the whole image is returned.
+
+        The result contains a red, green and blue byte for each pixel, row by
+        row, starting at the top left corner. If ``alpha`` is True, each pixel
+        also has a fourth byte, which is 0 for transparent pixels (see
+        :meth:`transparency_get`) and 255 for other pixels. For example::
+
+            >>> image = tk.Image(width=2, height=1)
+            >>> image.put_pixels(b'\\xff\\x00\\x00\\x00\\x00\\xff', 2, 1)
+            >>> image.get_pixels()
+            b'\\xff\\x00\\x00\\x00\\x00\\xff'
+            >>> list(image.get_pixels(alpha=True))
+            [255, 0, 0, 255, 0, 0, 255, 255]
+
+        This gets all pixels with one Tcl call, which is much faster than
+        calling :meth:`get` for each pixel.
+        """
+        return bytes(self._get_pixels(*self._region(region), alpha=alpha))
+
+    # returns a bytearray, so that to_array() can create a writable array
+    # without copying
+    def _get_pixels(self, x1, y1, x2, y2, *, alpha):
+        if x1 == x2 or y1 == y2:
+            return bytearray()
+
+        # 'imageName data' returns rows of '#rrggbb' strings
+        rows = tk.tcl_call(str, self, 'data', '-from', x1, y1, x2, y2)
+        rgb = bytearray.fromhex(rows.translate(_HEX_COLOR_JUNK))
+        if not alpha:
+            return rgb
+
+        transparent = tk.tcl_call(str, 'apply', _TRANSPARENCY_LAMBDA,
+                                  self, x1, y1, x2, y2)
+        result = bytearray(len(rgb) // 3 * 4)
+        for offset in range(3):
+            result[offset::4] = rgb[offset::3]
+        result[3::4] = transparent.encode('ascii').translate(_ALPHA_BYTES)
+        return result
+
+    def put_pixels(self, pixels, width, height, to=(0, 0), *, alpha=False):
+        """Set the colors of many pixels with one Tcl call.
+
+        ``pixels`` can be any object that supports the buffer protocol, such
+        as :class:`bytes`, :class:`bytearray`, :class:`memoryview` or
+        :class:`array.array`, and it must contain ``width * height`` pixels in
+        the format returned by :meth:`get_pixels`. The pixels are put to a
+        ``width`` by ``height`` area whose top left corner is at ``to``, and
+        the image grows if needed.
+
+        If ``alpha`` is True, each pixel has an alpha byte after the red, green
+        and blue bytes; 0 means fully transparent and 255 means not transparent
+        at all. Note that :meth:`get_pixels` can't return partially transparent
+        alpha values, because Tk can only tell whether a pixel is transparent.
+        """
+        pixels = memoryview(pixels).cast('B')
+        channels = 4 if alpha else 3
+        if len(pixels) != width * height * channels:
+            raise ValueError(
+                "expected %d bytes for %dx%d pixels, got %d bytes"
+                % (width * height * channels, width, height, len(pixels)))
+        if width == 0 or height == 0:
+            return
+
+        if alpha:
+            data = _png_bytes(pixels, width, height)
+            format = 'png'
+        else:
+            # the ppm header is easy to create and the rest of the data is
+            # just the pixels, so this doesn't copy more than necessary
+            data = b''.join([('P6 %d %d 255\n' % (width, height)).encode(
+                'ascii'), pixels])
+            format = 'ppm'
+
+        x, y = to
+        tk.tcl_call(None, self, 'put', data, '-format', format, '-to', x, y)
+
+    @classmethod
+    def from_array(cls, array):
+        """Create a new image from a NumPy array.
+
+        The array must have shape ``(height, width, 3)`` for RGB pixels or
+        ``(height, width, 4)`` for RGBA pixels, and its dtype must be
+        ``uint8``. See :meth:`put_pixels` for details about the alpha values.
+        For example, this creates a red 100x50 image::
+
+            import numpy
+
+            array = numpy.zeros((50, 100, 3), dtype=numpy.uint8)
+            array[:, :, 0] = 255
+            image = tk.Image.from_array(array)
+
+        NumPy is not installed with teek; this method and :meth:`to_array`
+        import it only when they are called. C-contiguous arrays, which are
+        the most common kind of arrays, are passed to :meth:`put_pixels`
+        without copying them.
+        """
+        import numpy    # teek doesn't depend on numpy, see docstring
+
+        if array.dtype != numpy.uint8:
+            raise ValueError("expected an array of uint8, got %s"
+                             % array.dtype)
+        if array.ndim != 3 or array.shape[2] not in (3, 4):
+            raise ValueError("expected an array of shape (height, width, 3) "
+                             "or (height, width, 4), got %r" % (array.shape,))
+
+        height, width, channels = array.shape
+        image = cls(width=width, height=height)
+        image.put_pixels(numpy.ascontiguousarray(array), width, height,
+                         alpha=(channels == 4))
+        return image
+
+    def to_array(self, region=None, *, alpha=False):
+        """Return the pixels of the image as a new NumPy array.
+
+        The array has dtype ``uint8`` and shape ``(height, width, 3)``, or
+        ``(height, width, 4)`` if ``alpha`` is True. The ``region`` and
+        ``alpha`` arguments work like with :meth:`get_pixels`. See
+        :meth:`from_array`.
+        """
+        import numpy    # teek doesn't depend on numpy, see from_array
+
+        x1, y1, x2, y2 = self._region(region)
+        pixels = self._get_pixels(x1, y1, x2, y2, alpha=alpha)
+        return numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(
+            (y2 - y1, x2 - x1, 4 if alpha else 3))
+
     def read(self, filename, **kwargs):
         """See ``imageName read filename`` in :man:`photo(3tk)`."""
         tk.tcl_call(None, self, 'read', filename, *_options(kwargs))
@@ -345,6 +345,10 @@ def to_tcl(value):
         return '1' if value else '0'
     if isinstance(value, numbers.Real):    # after bool check, bools are ints
         return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # _tkinter passes bytes objects to tcl as byte arrays without copying
+        # them to a tcl string first
+        return bytes(value)
 
     # assume it's some kind of iterable, this must be after the Mapping
     # and str stuff above
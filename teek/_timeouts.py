@@ -1,10 +1,75 @@
+import collections
+import functools
+import math
+import sys
+import time
+import traceback
+import types
+
 import teek as tk
-from teek._tcl_calls import make_thread_safe
+from teek._structures import _is_from_teek
+from teek._tcl_calls import counts, make_thread_safe
 
 
 # there's no after_info because i don't see how it would be useful in
 # teek
 
+# all timeouts run the same tcl command, and it finds the _Timeout object from
+# this dict, so that creating a timeout doesn't need to create a tcl command
+_pending_timeouts = {}      # {key: _Timeout}
+_dispatcher_command = None
+
+
+def _dispatch(key):
+    timeout = _pending_timeouts.pop(key, None)
+    if timeout is not None:
+        timeout._run()
+
+
+def _get_dispatcher_command():
+    global _dispatcher_command
+    if _dispatcher_command is None:
+        _dispatcher_command = tk.create_command(_dispatch, [int])
+    return _dispatcher_command
+
+
+# tk.quit() deletes the tcl interpreter and all its commands and timeouts
+def _forget_dispatcher_command():
+    global _dispatcher_command
+    _dispatcher_command = None
+    _pending_timeouts.clear()
+    _idle_queue.clear()
+
+
+tk.after_quit.connect(_forget_dispatcher_command)
+
+
+# this runs for every timeout, so it only saves the file names, line numbers
+# and function names, and the stack is cleaned up and formatted only if an
+# error occurs
+def _get_stack_info():
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, frame.f_lineno, code.co_name, None))
+        frame = frame.f_back
+    return stack
+
+
+def _print_error(stack):
+    # the most recent frame is first in the stack
+    stack = traceback.StackSummary.from_list(reversed(stack))
+    while stack and _is_from_teek(stack[-1]):
+        del stack[-1]
+
+    # see Callback.run for why this doesn't use sys.stderr.write
+    traceback_blabla, rest = traceback.format_exc().split('\n', 1)
+    print(traceback_blabla, file=sys.stderr)
+    print(''.join(traceback.format_list(stack)) + rest, end='',
+          file=sys.stderr)
+
+
 class _Timeout:
 
     def __init__(self, after_what, callback, args, kwargs):
@@ -14,36 +79,29 @@ class _Timeout:
         self._callback = callback
         self._args = args
         self._kwargs = kwargs
+        self._stack = _get_stack_info()
 
         self._state = 'pending'   # just for __repr__ and error messages
-        self._tcl_command = tk.create_command(self._run)
-        self._id = tk.tcl_call(str, 'after', after_what, self._tcl_command)
+        if after_what == 'idle':
+            self._id = 'idle'
+            _idle_queue.add(self)
+        else:
+            self._key = next(counts['timeouts'])
+            self._id = tk.tcl_call(str, 'after', after_what,
+                                   (_get_dispatcher_command(), self._key))
+            _pending_timeouts[self._key] = self
 
     def __repr__(self):
         name = getattr(self._callback, '__name__', self._callback)
         return '<%s %r timeout %r>' % (self._state, name, self._id)
 
     def _run(self):
-        needs_cleanup = True
-
-        # this is important, thread tests freeze without this special
-        # case for some reason
-        def quit_callback():
-            nonlocal needs_cleanup
-            needs_cleanup = False
-
-        tk.before_quit.connect(quit_callback)
-
         try:
             self._callback(*self._args, **self._kwargs)
             self._state = 'successfully completed'
-        except Exception as e:
+        except Exception:
             self._state = 'failed'
-            raise e
-        finally:
-            tk.before_quit.disconnect(quit_callback)
-            if needs_cleanup:
-                tk.delete_command(self._tcl_command)
+            _print_error(self._stack)
 
     @make_thread_safe
     def cancel(self):
@@ -54,9 +112,62 @@ class _Timeout:
         """
         if self._state != 'pending':
             raise RuntimeError("cannot cancel a %s timeout" % self._state)
-        tk.tcl_call(None, 'after', 'cancel', self._id)
         self._state = 'cancelled'
-        tk.delete_command(self._tcl_command)
+
+        # cancelled idle timeouts are skipped when the idle queue runs
+        if self._id != 'idle':
+            tk.tcl_call(None, 'after', 'cancel', self._id)
+            _pending_timeouts.pop(self._key, None)
+
+
+# the timeouts of after_idle() are ran by at most one tcl idle handler, and if
+# running them takes a long time, the rest of them run after tk has handled
+# other events
+_IDLE_QUEUE_KEY = 0     # the counts start at 1
+_IDLE_TIME_BUDGET = 0.02
+
+
+class _IdleQueue:
+
+    def __init__(self):
+        self._timeouts = collections.deque()
+
+    def add(self, timeout):
+        self._timeouts.append(timeout)
+        self._set_idle_handler()
+
+    def clear(self):
+        self._timeouts.clear()
+
+    def _set_idle_handler(self):
+        if _IDLE_QUEUE_KEY not in _pending_timeouts:
+            tk.tcl_call(None, 'after', 'idle',
+                        (_get_dispatcher_command(), _IDLE_QUEUE_KEY))
+            _pending_timeouts[_IDLE_QUEUE_KEY] = self
+
+    def _run(self):
+        end = time.perf_counter() + _IDLE_TIME_BUDGET
+
+        # like tk's idle handlers, timeouts added while this runs will run
+        # later, so that a timeout that adds itself again doesn't run forever,
+        # and a timeout that calls tk.update() can run the queue empty
+        remaining = len(self._timeouts)
+        while remaining > 0 and self._timeouts:
+            remaining -= 1
+            timeout = self._timeouts.popleft()
+            if timeout._state == 'pending':
+                timeout._run()
+            if _dispatcher_command is None:
+                # tk.quit() was called
+                return
+            if time.perf_counter() > end:
+                break
+
+        if self._timeouts:
+            self._set_idle_handler()
+
+
+_idle_queue = _IdleQueue()
 
 
 @make_thread_safe
@@ -73,5 +184,382 @@ def after(ms, callback, args=(), kwargs=None):
 
 @make_thread_safe
 def after_idle(callback, args=(), kwargs=None):
-    """Like :func:`after`, but runs the timeout as soon as possible."""
+    """Like :func:`after`, but runs the timeout as soon as possible.
+
+    The callbacks run in the same order as they were given to
+    :func:`after_idle`, when Tk has nothing else to do. Many callbacks don't
+    freeze the GUI, because if running them takes longer than about 20
+    milliseconds, Tk gets to handle other events before running the rest.
+    """
     return _Timeout('idle', callback, args, kwargs)
+
+
+class _RepeatingTimeout:
+
+    def __init__(self, interval_ms, callback, args, kwargs, align,
+                 skip_missed):
+        if interval_ms <= 0:
+            raise ValueError("interval must be positive, got %r"
+                             % (interval_ms,))
+        if kwargs is None:
+            kwargs = {}
+
+        self._callback = callback
+        self._args = args
+        self._kwargs = kwargs
+        self._stack = _get_stack_info()
+        self._interval = interval_ms / 1000
+        self._skip_missed = skip_missed
+
+        self._state = 'repeating'
+        self._key = next(counts['timeouts'])
+
+        # the deadlines are absolute times, so that the time spent in the
+        # callbacks and the event loop doesn't add up
+        now = time.monotonic()
+        if align:
+            self._deadline = (now + self._interval -
+                              time.time() % self._interval)
+        else:
+            self._deadline = now + self._interval
+        self._schedule(now)
+
+    def __repr__(self):
+        name = getattr(self._callback, '__name__', self._callback)
+        return '<%s %r timeout %r>' % (self._state, name, self._id)
+
+    def _schedule(self, now):
+        # rounding up avoids running before the deadline
+        ms = max(0, math.ceil((self._deadline - now) * 1000))
+        self._id = tk.tcl_call(str, 'after', ms,
+                               (_get_dispatcher_command(), self._key))
+        _pending_timeouts[self._key] = self
+
+    def _run(self):
+        try:
+            self._callback(*self._args, **self._kwargs)
+        except Exception:
+            _print_error(self._stack)
+
+        # the callback may cancel the timeout or call tk.quit()
+        if self._state != 'repeating' or _dispatcher_command is None:
+            return
+
+        now = time.monotonic()
+        self._deadline += self._interval
+        if self._skip_missed and self._deadline < now:
+            # the event loop was busy, so the missed runs are replaced with
+            # the run that just happened
+            missed = (now - self._deadline) // self._interval + 1
+            self._deadline += missed * self._interval
+        self._schedule(now)
+
+    @make_thread_safe
+    def cancel(self):
+        """Stop running the callback.
+
+        :exc:`RuntimeError` is raised if the timeout has been cancelled
+        already.
+        """
+        if self._state != 'repeating':
+            raise RuntimeError("cannot cancel a %s timeout" % self._state)
+        tk.tcl_call(None, 'after', 'cancel', self._id)
+        self._state = 'cancelled'
+        _pending_timeouts.pop(self._key, None)
+
+
+@make_thread_safe
+def every(interval_ms, callback, args=(), kwargs=None, *, align=False,
+          skip_missed=True):
+    """Run ``callback(*args, **kwargs)`` repeatedly, every *interval_ms*.
+
+    This returns a timeout object like :func:`after` does, and calling its
+    ``cancel()`` method stops the repeating. The callback can cancel the
+    timeout too, and errors in the callback are printed without stopping the
+    repeating.
+
+    The times when the callback should run are calculated from the time when
+    :func:`every` was called, so the callback doesn't run later and later
+    because of the time spent in the callback and elsewhere in the event loop,
+    like it would if the callback called :func:`after` again.
+
+    If ``align`` is True, the callback runs when :func:`time.time` is a
+    multiple of the interval. For example, ``tk.every(1000, callback,
+    align=True)`` runs the callback at the beginning of every second.
+
+    If the event loop is too busy to run the callback on time, the callback
+    runs once when possible, and then continues at the next time that hasn't
+    passed yet. Pass ``skip_missed=False`` to instead run the callback as many
+    times as it was supposed to run, as soon as possible.
+    """
+    return _RepeatingTimeout(interval_ms, callback, args, kwargs,
+                             align, skip_missed)
+
+
+# this is the timer structure shared by debounce and throttle, there's one
+# dispatcher key for each decorated function, and moving the time when the
+# function should run later doesn't cancel anything; when the tcl timer runs
+# too early, it's just scheduled again
+class _RateLimitedFunction:
+
+    def __init__(self, ms, function):
+        functools.update_wrapper(self, function)
+        self._interval = ms / 1000
+        self._function = function
+        self._attribute_name = getattr(function, '__name__', None)
+        self._stack = _get_stack_info()
+        self._key = next(counts['timeouts'])
+        self._id = None
+        self._waiting_call = None     # (args, kwargs) or None
+        self._run_time = None         # time.monotonic() value
+        self._last_run = None
+
+    def __repr__(self):
+        return '<%s %r, %gms>' % (type(self).__name__.lstrip('_'),
+                                  self._function, self._interval * 1000)
+
+    def __set_name__(self, owner, name):
+        self._attribute_name = name
+
+    # each instance gets a separate timer for a decorated method, and it's
+    # stored in the instance's __dict__ like functools.cached_property does
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        bound = type(self)(self._interval * 1000,
+                           types.MethodType(self._function, instance))
+        bound._stack = self._stack
+        instance.__dict__[self._attribute_name] = bound
+        return bound
+
+    def _set_timer(self, now):
+        if self._key in _pending_timeouts:
+            # the timer is running already
+            return
+        ms = max(0, math.ceil((self._run_time - now) * 1000))
+        self._id = tk.tcl_call(str, 'after', ms,
+                               (_get_dispatcher_command(), self._key))
+        _pending_timeouts[self._key] = self
+
+    def _run(self):
+        if self._waiting_call is None:
+            return
+        now = time.monotonic()
+        if now < self._run_time:
+            self._set_timer(now)
+            return
+
+        args, kwargs = self._waiting_call
+        self._waiting_call = None
+        self._call_now(args, kwargs, now)
+
+    def _call_now(self, args, kwargs, now):
+        self._last_run = now
+        try:
+            self._function(*args, **kwargs)
+        except Exception:
+            _print_error(self._stack)
+
+    @make_thread_safe
+    def cancel(self):
+        """Forget the call that hasn't ran yet, if any."""
+        self._waiting_call = None
+        if _pending_timeouts.pop(self._key, None) is not None:
+            tk.tcl_call(None, 'after', 'cancel', self._id)
+
+
+class _Debounced(_RateLimitedFunction):
+
+    @make_thread_safe
+    def __call__(self, *args, **kwargs):
+        now = time.monotonic()
+        self._waiting_call = (args, kwargs)
+        self._run_time = now + self._interval
+        self._set_timer(now)
+
+
+class _Throttled(_RateLimitedFunction):
+
+    @make_thread_safe
+    def __call__(self, *args, **kwargs):
+        now = time.monotonic()
+        if self._waiting_call is None and (
+                self._last_run is None or
+                now >= self._last_run + self._interval):
+            self._call_now(args, kwargs, now)
+        else:
+            self._waiting_call = (args, kwargs)
+            self._run_time = self._last_run + self._interval
+            self._set_timer(now)
+
+
+def debounce(ms):
+    """A decorator that runs a function when it's no longer called often.
+
+    Calling the decorated function schedules the function to run with the
+    same arguments after *ms* milliseconds, but if the decorated function is
+    called again before that, only the latest call runs, *ms* milliseconds
+    after it. For example, this searches only when the user stops typing for
+    300 milliseconds, not after every key press::
+
+        @tk.debounce(300)
+        def search(var):
+            ...
+
+        search_var = tk.StringVar()
+        search_var.write_trace.connect(search)
+        tk.Entry(window, textvariable=search_var).pack()
+
+    The decorated function returns None, so it can be used with
+    :class:`.Callback` objects and :ref:`bindings <binding>`. It also has a
+    ``cancel()`` method that forgets the call that hasn't ran yet, and like
+    :func:`after`, it can be called from any thread.
+
+    Delaying the call doesn't create or cancel Tcl timers, so it's fine to call
+    the decorated function very often. This can also be used for decorating
+    methods, and each instance of the class gets a separate timer.
+    """
+    return functools.partial(_Debounced, ms)
+
+
+def throttle(ms):
+    """A decorator that makes a function run at most once in *ms* milliseconds.
+
+    When the decorated function is called, the function runs right away,
+    unless it ran less than *ms* milliseconds ago. In that case, it runs when
+    *ms* milliseconds have passed since it ran, with the arguments of the
+    latest call; the calls between that and the previous run are ignored. For
+    example, this redraws at most 20 times per second while a window is being
+    resized, and also after the resizing stopped::
+
+        @tk.throttle(50)
+        def redraw():
+            ...
+
+        window.bind('<Configure>', redraw)
+
+    Otherwise this works like :func:`debounce`.
+    """
+    return functools.partial(_Throttled, ms)
+
+
+class _Task:
+
+    def __init__(self, generator, budget_ms):
+        if budget_ms <= 0:
+            raise ValueError("budget must be positive, got %r" % (budget_ms,))
+
+        self._generator = generator
+        self._budget = budget_ms / 1000
+        self._stack = _get_stack_info()
+        self._stepping = False
+
+        self.state = 'running'
+        self.result = None
+        self.time_used = 0.0
+        self.on_done = tk.Callback()
+        self._schedule()
+
+    def __repr__(self):
+        name = getattr(self._generator, '__name__', self._generator)
+        return '<%s %r task, %.3fs used>' % (self.state, name, self.time_used)
+
+    def _schedule(self):
+        self._timeout = _Timeout('idle', self._run_slice, (), None)
+
+    def _run_slice(self):
+        start = time.perf_counter()
+        end = start + self._budget
+        self._stepping = True
+        try:
+            while self.state == 'running' and time.perf_counter() < end:
+                next(self._generator)
+        except StopIteration as e:
+            self.result = e.value
+            self.state = 'completed'
+        except Exception:
+            _print_error(self._stack)
+            self.state = 'failed'
+        finally:
+            self._stepping = False
+            self.time_used += time.perf_counter() - start
+
+        if _dispatcher_command is None:
+            # tk.quit() was called
+            return
+
+        if self.state == 'running':
+            self._schedule()
+        else:
+            if self.state == 'cancelled':
+                # the generator cancelled its own task
+                self._close_generator()
+            self.on_done.run(self)
+
+    def _close_generator(self):
+        try:
+            self._generator.close()
+        except Exception:
+            _print_error(self._stack)
+
+    @make_thread_safe
+    def cancel(self):
+        if self.state != 'running':
+            raise RuntimeError("cannot cancel a %s task" % self.state)
+        self.state = 'cancelled'
+
+        # if the generator calls this, _run_slice() will do the rest
+        if not self._stepping:
+            self._timeout.cancel()
+            self._close_generator()
+            self.on_done.run(self)
+
+
+@make_thread_safe
+def spawn(generator, *, budget_ms=10):
+    """Run a generator in small pieces in the event loop.
+
+    This is useful for long-running things that must be done in the event
+    loop, e.g. because they use widgets. Put ``yield`` statements between
+    short parts of the work, and give the generator to this function. It
+    runs the generator until about *budget_ms* milliseconds have passed,
+    lets Tk handle other events, and then continues. For example::
+
+        def add_lines(textwidget):
+            for number in range(100000):
+                textwidget.insert(textwidget.end, 'line %d\\n' % number)
+                yield
+
+        task = tk.spawn(add_lines(some_text_widget))
+
+    This returns a **task object** that has these attributes and methods:
+
+    .. attribute:: task.state
+
+        ``'running'``, ``'completed'``, ``'failed'`` or ``'cancelled'``. If
+        the generator raises an exception, a traceback is printed and the
+        state becomes ``'failed'``.
+
+    .. attribute:: task.result
+
+        The return value of the generator, or None if it hasn't returned.
+
+    .. attribute:: task.time_used
+
+        How many seconds have been spent running the generator, as a float.
+
+    .. attribute:: task.on_done
+
+        A :class:`.Callback` that runs with the task object as an argument
+        when the state changes from ``'running'`` to something else.
+
+    .. method:: task.cancel()
+
+        Stop running the generator. The generator is closed, so ``finally``
+        blocks and ``with`` statements in it run. :exc:`RuntimeError` is
+        raised if the task isn't running.
+
+    Tasks don't need threads, and unlike calling :func:`.update` in a loop,
+    they don't run event handlers in the middle of the generator's code.
+    """
+    return _Task(generator, budget_ms)
@@ -2,12 +2,12 @@ import collections.abc
 import contextlib
 import functools
 import keyword
-import operator
 import re
 
 import teek as tk
 from teek._tcl_calls import counts, from_tcl, make_thread_safe
-from teek._structures import ConfigDict, CgetConfigureConfigDict, after_quit
+from teek._structures import (
+    ConfigDict, CgetConfigureConfigDict, _TypeTable, after_quit)
 
 _widgets = {}
 _class_bindings = {}
@@ -62,16 +62,19 @@ class StateSet(collections.abc.MutableSet):
         self._widget._call(None, self._widget, 'state', '!' + state)
 
 
+_GRID_ROW_OR_COLUMN_TYPES = {
+    'minsize': tk.ScreenDistance,
+    'weight': float,
+    'uniform': str,
+    'pad': tk.ScreenDistance,
+}
+
+
 class GridRowOrColumnConfig(ConfigDict):
 
     def __init__(self, configure_method):
         super().__init__()
-        self._types.update({
-            'minsize': tk.ScreenDistance,
-            'weight': float,
-            'uniform': str,
-            'pad': tk.ScreenDistance,
-        })
+        self._types = _TypeTable(_GRID_ROW_OR_COLUMN_TYPES)
         self._configure = configure_method
 
     def _set(self, option, value):
@@ -238,12 +241,14 @@ class Widget:
 
         # TODO: some config options can only be given when the widget is
         # created, add support for them
-        self._call(None, type(self)._widget_name, self.to_tcl())
+        self._create_tcl_widget()
         _widgets[self.to_tcl()] = self
 
         self.config = CgetConfigureConfigDict(
             lambda returntype, *args: self._call(returntype, self, *args))
-        self._init_config()     # subclasses should override this and use super
+        # subclasses should override _init_config and use super, and all
+        # widgets of the same class share the same option types
+        self.config._share_types(type(self), self._init_config)
 
         # support kwargs like from_=1, because from=1 is invalid syntax
         for invalid_syntax in keyword.kwlist:
@@ -265,6 +270,11 @@ class Widget:
         else:
             self.state = None
 
+    # can be overrided in subclasses that need to create the tcl widget in a
+    # different way, see Text.create_peer()
+    def _create_tcl_widget(self):
+        self._call(None, type(self)._widget_name, self.to_tcl())
+
     def _init_config(self):
         # width and height aren't here because they are integers for some
         # widgets and ScreenDistances for others... and sometimes the manual
@@ -716,6 +726,8 @@ _BIND_SUBS = [
 
 class Event:
 
+    __slots__ = [attrib for character, type_, attrib in _BIND_SUBS]
+
     def __repr__(self):
         # try to avoid making the repr too verbose
         ignored_names = ['widget', 'sendevent', 'subwindow', 'time',
@@ -723,8 +735,11 @@ class Event:
         ignored_values = [None, '??', -1, 0]
 
         pairs = []
-        for name, value in sorted(self.__dict__.items(),
-                                  key=operator.itemgetter(0)):
+        for name in sorted(type(self).__slots__):
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
             if name not in ignored_names and value not in ignored_values:
                 display_name = 'data' if name == '_data' else name
                 pairs.append('%s=%r' % (display_name, value))
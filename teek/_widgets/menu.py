@@ -57,6 +57,9 @@ class MenuItem:
         Don't set this attribute yourself.
     """
 
+    __slots__ = ('_options', 'type', '_command_callback', '_args', '_kwargs',
+                 '_menu', '_index', 'config')
+
     def __init__(self, *args, **kwargs):
         self._options = kwargs.copy()
 
@@ -91,6 +94,10 @@ class MenuItem:
         self._index = None
 
         self.config = CgetConfigureConfigDict(self._config_entrycommand_caller)
+        self.config._share_types((MenuItem, self.type), self._init_types)
+        self.config._special['command'] = self._create_command
+
+    def _init_types(self):
         self.config._types.update({
             'activebackground': tk.Color,
             'activeforeground': tk.Color,
@@ -116,7 +123,6 @@ class MenuItem:
             'variable': (tk.BooleanVar if self.type == 'checkbutton'
                          else tk.StringVar),
         })
-        self.config._special['command'] = self._create_command
 
     def __repr__(self):
         parts = ['type=%r' % self.type]
@@ -2,25 +2,28 @@ import collections.abc
 import weakref
 
 import teek as tk
-from teek._structures import ConfigDict
+from teek._structures import ConfigDict, _TypeTable
 from teek._tcl_calls import make_thread_safe
 from teek._widgets.base import ChildMixin, Widget
 
 
+_TAB_TYPES = {
+    'state': str,
+    'sticky': str,
+    'padding': [tk.ScreenDistance],
+    'text': str,
+    'image': tk.Image,
+    'compound': str,
+    'underline': int,
+}
+
+
 class TabConfigDict(ConfigDict):
 
     def __init__(self, tab):
         self._tab = tab
         super().__init__()
-        self._types.update({
-            'state': str,
-            'sticky': str,
-            'padding': [tk.ScreenDistance],
-            'text': str,
-            'image': tk.Image,
-            'compound': str,
-            'underline': int,
-        })
+        self._types = _TypeTable(_TAB_TYPES)
 
     # self._tab.widget.parent is the notebook, lol
     def _set(self, option, value):
@@ -95,6 +98,8 @@ class NotebookTab:
         from this dict.
     """
 
+    __slots__ = ('widget', 'config', 'initial_options')
+
     @make_thread_safe
     def __init__(self, widget, **kwargs):
         if not isinstance(widget.parent, Notebook):
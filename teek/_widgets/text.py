@@ -1,12 +1,143 @@
 import collections.abc
+import difflib
 import functools
 import re
+import time
 
 import teek as tk
-from teek._structures import CgetConfigureConfigDict
-from teek._tcl_calls import make_thread_safe
+from teek._structures import CgetConfigureConfigDict, _TypeTable
+from teek._tcl_calls import counts, make_thread_safe
 from teek._widgets.base import BindingDict, ChildMixin, Widget
 
+# this is ran with 'apply' so that finding all matches, calculating their end
+# indexes and optionally tagging them all happens in one tcl call, instead of
+# doing at least one call for each match
+_SEARCH_ALL_LAMBDA = '''{widget first last options pattern args} {
+    set counts {}
+    set starts [$widget search -all -count counts {*}$options -- \\
+                $pattern $first $last]
+
+    # the counts are display index positions, so embedded windows and images
+    # are included, but elided text is not
+    set ranges {}
+    foreach start $starts count $counts {
+        lappend ranges $start [$widget index "$start + $count display indices"]
+    }
+    if {[llength $args] != 0 && [llength $ranges] != 0} {
+        $widget tag add [lindex $args 0] {*}$ranges
+    }
+    return $ranges
+}'''
+
+# the text widget's tcl command is replaced with an alias to this when the
+# content changes need to be tracked, see Text.on_change
+#
+# insert, delete, replace and the undo and redo edit subcommands are the only
+# ways to change the text. Changes are reported as (first, last, new_text),
+# meaning that text between first and last was replaced with new_text. The
+# right-gravity mark ends up after the new text no matter what was done.
+_CHANGE_TRACKER_LAMBDA = '''{real notify args} {
+    set subcommand [lindex $args 0]
+    if {$subcommand eq "edit"} {
+        set changes_text [expr {[lindex $args 1] in {undo redo}}]
+    } else {
+        set changes_text [expr {$subcommand in {insert delete replace}}]
+    }
+    if {!$changes_text || [$real cget -state] eq "disabled" ||
+            [catch {
+                set indexes [lrange $args 1 end]
+                switch -- $subcommand {
+                    insert {
+                        set indexes [lrange $indexes 0 0]
+                    }
+                    delete {
+                        if {[llength $indexes] % 2 == 1} {
+                            lappend indexes "[lindex $indexes end] + 1 char"
+                        }
+                    }
+                    replace {
+                        set indexes [lrange $indexes 0 1]
+                    }
+                    edit {
+                        set indexes {1.0 {end - 1 char}}
+                    }
+                }
+
+                set first [$real index "end - 1 char"]
+                set last 1.0
+                foreach index $indexes {
+                    set index [$real index $index]
+                    if {[$real compare $index > "end - 1 char"]} {
+                        set index [$real index "end - 1 char"]
+                    }
+                    if {[$real compare $index < $first]} {
+                        set first $index
+                    }
+                    if {[$real compare $index > $last]} {
+                        set last $index
+                    }
+                }
+                if {[$real compare $last < $first]} {
+                    set last $first
+                }
+            }]} {
+        # nothing changes, or this will fail and $real creates the error
+        return [$real {*}$args]
+    }
+
+    $real mark set teek_change_last $last
+    $real mark gravity teek_change_last right
+    set code [catch {$real {*}$args} result options]
+    set new_last [$real index teek_change_last]
+    $real mark unset teek_change_last
+    if {$code != 0} {
+        return -options $options $result
+    }
+
+    set new_text [$real get $first $new_last]
+    if {$first ne $last || $new_text ne ""} {
+        $notify $first $last $new_text
+    }
+    return $result
+}'''
+
+# this replaces many parts of the text at once, see Text.set_content()
+_MULTI_REPLACE_LAMBDA = '''{widget replacements} {
+    foreach {start end new_text} $replacements {
+        $widget replace $start $end $new_text
+    }
+}'''
+
+# these are used in MarksDict to get mark indexes with one tcl call. Marks can
+# be after tk's invisible newline at the end, and "end - 1 char" is the end
+# that teek uses, see Text.end. Checking the gravity fails if the mark doesn't
+# exist, and then the result is an empty string.
+_MARK_INDEX_LAMBDA = '''{widget name} {
+    if {[catch {$widget mark gravity $name}]} {
+        return ""
+    }
+    if {[$widget compare $name > "end - 1 char"]} {
+        return [$widget index "end - 1 char"]
+    }
+    return [$widget index $name]
+}'''
+
+_MARK_SNAPSHOT_LAMBDA = '''{widget} {
+    set end [$widget index "end - 1 char"]
+    set result {}
+    foreach name [$widget mark names] {
+        if {[$widget compare $name > $end]} {
+            lappend result $name $end
+        } else {
+            lappend result $name [$widget index $name]
+        }
+    }
+    return $result
+}'''
+
+TextChange = collections.namedtuple(
+    'TextChange', ['kind', 'start', 'end', 'new_text'])
+
 
 # a new subclass of IndexBase is created for each text widget, and inheriting
 # from namedtuple makes comparing the text indexes work nicely
@@ -57,46 +188,63 @@ class IndexBase(collections.namedtuple('TextIndex', 'line column')):
     wordend = functools.partialmethod(_apply_suffix, 'wordend')
 
 
+_TAG_TYPES = {
+    'background': tk.Color,
+    #'bgstipple': ???,
+    'borderwidth': tk.ScreenDistance,
+    'elide': bool,
+    #'fgstipple': ???,
+    'font': tk.Font,
+    'foreground': tk.Color,
+    'justify': str,
+    'lmargin1': tk.ScreenDistance,
+    'lmargin2': tk.ScreenDistance,
+    'lmargin3': tk.ScreenDistance,
+    'lmargincolor': tk.Color,
+    'offset': tk.ScreenDistance,
+    'overstrike': bool,
+    'overstrikefg': tk.Color,
+    'relief': str,
+    'rmargin': tk.ScreenDistance,
+    'rmargincolor': tk.Color,
+    'selectbackground': tk.Color,
+    'selectforeground': tk.Color,
+    'spacing1': tk.ScreenDistance,
+    'spacing2': tk.ScreenDistance,
+    'spacing3': tk.ScreenDistance,
+    'tabs': [str],
+    'tabstyle': str,
+    'underline': bool,
+    'underlinefg': tk.Color,
+    'wrap': str,
+}
+
+
 class Tag(CgetConfigureConfigDict):
 
+    # there may be many tags, e.g. when highlighting a big file
+    __slots__ = ('_widget', 'name', '_bindings')
+
     def __init__(self, widget, name):
         self._widget = widget
         self.name = name
         super().__init__(self._call_tag_subcommand)
+        self._types = _TypeTable(_TAG_TYPES)
+        self._bindings = None
 
-        self._types.update({
-            'background': tk.Color,
-            #'bgstipple': ???,
-            'borderwidth': tk.ScreenDistance,
-            'elide': bool,
-            #'fgstipple': ???,
-            'font': tk.Font,
-            'foreground': tk.Color,
-            'justify': str,
-            'lmargin1': tk.ScreenDistance,
-            'lmargin2': tk.ScreenDistance,
-            'lmargin3': tk.ScreenDistance,
-            'lmargincolor': tk.Color,
-            'offset': tk.ScreenDistance,
-            'overstrike': bool,
-            'overstrikefg': tk.Color,
-            'relief': str,
-            'rmargin': tk.ScreenDistance,
-            'rmargincolor': tk.Color,
-            'selectbackground': tk.Color,
-            'selectforeground': tk.Color,
-            'spacing1': tk.ScreenDistance,
-            'spacing2': tk.ScreenDistance,
-            'spacing3': tk.ScreenDistance,
-            'tabs': [str],
-            'tabstyle': str,
-            'underline': bool,
-            'underlinefg': tk.Color,
-            'wrap': str,
-        })
-
-        self.bindings = BindingDict(self._call_bind, widget.command_list)
-        self.bind = self.bindings._convenience_bind
+    @property
+    def bindings(self):
+        if self._bindings is None:
+            if self.name == 'sel':
+                self._bindings = BindingDict(self._call_bind,
+                                             self._widget.command_list)
+            else:
+                # tk shares tag bindings between peers
+                self._bindings = self._widget._get_tag_bindings(self.name)
+        return self._bindings
+
+    def bind(self, *args, **kwargs):
+        return self.bindings._convenience_bind(*args, **kwargs)
 
     def __repr__(self):
         return '<Text widget tag %r>' % self.name
@@ -115,7 +263,12 @@ class Tag(CgetConfigureConfigDict):
     def __eq__(self, other):
         if not isinstance(other, Tag):
             return NotImplemented
-        return self._widget is other._widget and self.name == other.name
+        if self.name != other.name:
+            return False
+        # peers share all tags except the selection tag
+        if self.name == 'sel':
+            return self._widget is other._widget
+        return self._widget._shared is other._widget._shared
 
     def __hash__(self):
         return hash(self.name)
@@ -126,6 +279,23 @@ class Tag(CgetConfigureConfigDict):
         index2 = self._widget._get_index_obj(index2)
         return self._call_tag_subcommand(None, 'add', index1, index2)
 
+    def _add_or_remove_ranges(self, add_or_remove, index_pairs):
+        flat_indexes = []
+        for index1, index2 in index_pairs:
+            flat_indexes.extend([index1, index2])
+
+        flat_indexes = self._widget._get_index_objs(flat_indexes)
+        if flat_indexes:
+            self._call_tag_subcommand(None, add_or_remove, *flat_indexes)
+
+    @make_thread_safe
+    def add_ranges(self, index_pairs):
+        self._add_or_remove_ranges('add', index_pairs)
+
+    @make_thread_safe
+    def remove_ranges(self, index_pairs):
+        self._add_or_remove_ranges('remove', index_pairs)
+
     # TODO: bind
 
     def delete(self):
@@ -206,16 +376,125 @@ class MarksDict(collections.abc.MutableMapping):
 
     @make_thread_safe
     def __getitem__(self, name):
-        if name not in self._get_name_list():
-            raise KeyError(name)
-
         result = self._widget._call(
-            self._widget.TextIndex, self._widget, 'index', name)
-        return result.between_start_end()
+            str, 'apply', _MARK_INDEX_LAMBDA, self._widget, name)
+        if not result:
+            raise KeyError(name)
+        return self._widget.TextIndex.from_tcl(result)
 
     def __delitem__(self, name):
         self._widget._call(None, self._widget, 'mark', 'unset', name)
 
+    @make_thread_safe
+    def snapshot(self):
+        """Return a dictionary with all mark names and their indexes.
+
+        This gets everything with one Tcl call, which is much faster than
+        ``dict(text.marks)`` when there are many marks.
+        """
+        flat = self._widget._call(
+            [str], 'apply', _MARK_SNAPSHOT_LAMBDA, self._widget)
+        from_tcl = self._widget.TextIndex.from_tcl
+        return {name: from_tcl(index)
+                for name, index in zip(flat[0::2], flat[1::2])}
+
+
+def _read_chunks(source, chunk_size):
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        parts = []
+        size = 0
+        for part in source:
+            parts.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                yield ''.join(parts)
+                parts.clear()
+                size = 0
+        if parts:
+            yield ''.join(parts)
+
+
+class _StreamLoader:
+
+    def __init__(self, textwidget, chunks, mark, tag_list, budget_ms):
+        self._textwidget = textwidget
+        self._chunks = chunks
+        self._mark = mark
+        self._tag_list = tag_list
+        self._budget = budget_ms / 1000
+        self._state = 'loading'     # just for __repr__ and error messages
+        self.characters_loaded = 0
+        self.on_progress = tk.Callback()
+        self.on_done = tk.Callback()
+        self._timeout = tk.after_idle(self._load_some)
+
+    def __repr__(self):
+        return '<%s stream loader: %d characters loaded>' % (
+            self._state, self.characters_loaded)
+
+    def _finish(self, state):
+        self._state = state
+        self._timeout = None
+        if self._textwidget.winfo_exists():
+            self._textwidget._call(
+                None, self._textwidget, 'mark', 'unset', self._mark)
+
+    def _load_some(self):
+        if not self._textwidget.winfo_exists():
+            self._finish('cancelled')
+            return
+
+        deadline = time.perf_counter() + self._budget
+        try:
+            for chunk in self._chunks:
+                self._textwidget._call(None, self._textwidget, 'insert',
+                                       self._mark, chunk, self._tag_list)
+                self.characters_loaded += len(chunk)
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self._finish('successfully completed')
+                self.on_progress.run(self.characters_loaded)
+                self.on_done.run()
+                return
+        except Exception:
+            self._finish('failed')
+            raise
+
+        # let tk handle events and redraw before loading more
+        self._timeout = tk.after_idle(self._load_some)
+        self.on_progress.run(self.characters_loaded)
+
+    @make_thread_safe
+    def cancel(self):
+        """Stop loading. The already loaded text is left in the widget.
+
+        :exc:`RuntimeError` is raised if the loading has already completed,
+        failed or been cancelled.
+        """
+        if self._state != 'loading':
+            raise RuntimeError("cannot cancel a %s stream loader"
+                               % self._state)
+        self._timeout.cancel()
+        self._finish('cancelled')
+
+
+# things that a text widget and all its peers have in common
+class _SharedText:
+
+    def __init__(self):
+        self.widgets = []
+        self.on_change = None
+        self.tag_bindings = {}      # {tag name: BindingDict}, except 'sel'
+        self.command_list = []      # for tag bindings
+        self.line_count = None      # updated only when on_change is used
+
 
 class Text(ChildMixin, Widget):
     r"""This is the text widget.
@@ -229,8 +508,8 @@ class Text(ChildMixin, Widget):
         and end of the text.
 
         .. tip::
-            Use ``textwidget.end.line`` to count the number of lines of text
-            in the text widget.
+            Use :attr:`line_count` or ``textwidget.end.line`` to count the
+            number of lines of text in the text widget.
 
         Note that ``end`` changes when the text widget's content changes:
 
@@ -276,14 +555,113 @@ class Text(ChildMixin, Widget):
 
     _widget_name = 'text'
     tk_class_name = 'Text'
+    _text_index_class = None
 
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, *, peer_of=None, **kwargs):
+        # _create_tcl_widget() needs this, and it's called by super().__init__
+        self._peer_of = peer_of
         super().__init__(parent, **kwargs)
-        self.TextIndex = type(     # creates a new subclass of IndexBase
-            'TextIndex', (IndexBase,), {'_widget': self})
+        del self._peer_of
         self._tag_objects = {}
+        self._destroy_watched = False
         self.marks = MarksDict(self)
 
+        if peer_of is None:
+            self._shared = _SharedText()
+        else:
+            self._shared = peer_of._shared
+        self._shared.widgets.append(self)
+        if peer_of is not None:
+            self._watch_destroying()
+        if self._shared.on_change is not None:
+            self._track_changes()
+
+    # this is created when it's needed, because creating a class uses quite a
+    # lot of memory, and some text widgets are never used with indexes
+    @property
+    def TextIndex(self):
+        if self._text_index_class is None:
+            # creates a new subclass of IndexBase
+            self._text_index_class = type(
+                'TextIndex', (IndexBase,), {'_widget': self})
+        return self._text_index_class
+
+    def _create_tcl_widget(self):
+        if self._peer_of is None:
+            super()._create_tcl_widget()
+        else:
+            self._call(None, self._peer_of, 'peer', 'create', self.to_tcl())
+
+    @make_thread_safe
+    def create_peer(self, parent, **kwargs):
+        """Create and return a new text widget that shows the same text.
+
+        The peer is a :class:`.Text` widget with ``parent`` as its parent
+        widget, and ``kwargs`` are :ref:`options <options>` for it. The text,
+        :ref:`tags <textwidget-tags>`, marks and undo history are stored only
+        once, and all peers see the same text. Changing it in one peer updates
+        all other peers as well:
+
+        >>> window = tk.Window()
+        >>> text = tk.Text(window)
+        >>> peer = text.create_peer(window, height=5)
+        >>> text.insert(text.start, 'hello')
+        >>> peer.get()
+        'hello'
+        >>> peer.get_tag('bold') == text.get_tag('bold')
+        True
+
+        The ``sel`` tag is an exception; each peer has a separate selection.
+        The :attr:`on_change` callback is shared too, so a function connected
+        to it runs for changes done in any of the peers.
+
+        Options like ``startline`` and ``endline`` can be used for showing
+        only a part of the text in a peer. Methods of the peer and its tag
+        objects use line numbers relative to what the peer shows, but the tag
+        :ref:`bindings <binding>` are shared by all peers. See ``pathName
+        peer`` in :man:`text(3tk)` for more details.
+
+        ``text.create_peer(parent, **kwargs)`` does the same thing as
+        ``tk.Text(parent, peer_of=text, **kwargs)``.
+        """
+        return Text(parent, peer_of=self, **kwargs)
+
+    # the shared things must not refer to destroyed widgets, but this is
+    # needed only with peers or shared tag bindings, so most text widgets
+    # don't get a <Destroy> binding
+    def _watch_destroying(self):
+        for widget in self._shared.widgets:
+            if not widget._destroy_watched:
+                widget.bindings['<Destroy>'].connect(widget._on_destroy)
+                widget._destroy_watched = True
+
+    def _on_destroy(self, event):
+        self._shared.widgets.remove(self)
+        if not self._shared.widgets:
+            for command in self._shared.command_list:
+                tk.delete_command(command)
+            self._shared.command_list.clear()
+            self._shared.tag_bindings.clear()
+
+    def _get_tag_bindings(self, tag_name):
+        shared = self._shared
+        try:
+            return shared.tag_bindings[tag_name]
+        except KeyError:
+            pass
+
+        def call_bind(returntype, *args):
+            # any peer will do
+            widget = shared.widgets[0]
+            return widget._call(returntype, widget, 'tag', 'bind', tag_name,
+                                *args)
+
+        # the commands must not be deleted when one of the peers is destroyed
+        bindings = BindingDict(call_bind, shared.command_list)
+        shared.tag_bindings[tag_name] = bindings
+        self._watch_destroying()
+        return bindings
+
     def _init_config(self):
         super()._init_config()
         self.config._types.update({
@@ -308,6 +686,90 @@ class Text(ChildMixin, Widget):
             'wrap': str,
         })
 
+    def _run_on_change(self, first, last, new_text):
+        if first == last:
+            kind = 'insert'
+        elif new_text:
+            kind = 'replace'
+        else:
+            kind = 'delete'
+
+        if self._shared.line_count is not None:
+            self._shared.line_count += (
+                new_text.count('\n') - (last.line - first.line))
+        return self._shared.on_change.run(
+            TextChange(kind, first, last, new_text))
+
+    def _track_changes(self):
+        notify_command = tk.create_command(
+            self._run_on_change, [self.TextIndex, self.TextIndex, str])
+        self.command_list.append(notify_command)
+
+        # tk's bindings do things like '$w insert insert $char', so
+        # replacing the widget command catches the user's changes too
+        real_command = self.to_tcl() + '_teek_real'
+        self._call(None, 'rename', self, real_command)
+        self._call(None, 'interp', 'alias', '', self, '', 'apply',
+                   _CHANGE_TRACKER_LAMBDA, real_command, notify_command)
+
+        # deleting the widget command deletes the alias, tk deletes the
+        # real widget command when the widget is destroyed
+        self.command_list.append(self.to_tcl())
+
+    @property
+    @make_thread_safe
+    def on_change(self):
+        """A :class:`.Callback` that runs when the text in the widget changes.
+
+        The connected functions will be called with one argument, a change
+        object. It's a :any:`namedtuple <collections.namedtuple>` with these
+        attributes:
+
+        * ``kind`` is ``'insert'``, ``'delete'`` or ``'replace'``.
+        * ``start`` and ``end`` are :ref:`text indexes <textwidget-index>`
+          that tell which text was deleted or replaced. They are the same
+          index if ``kind`` is ``'insert'``, and in that case it's the index
+          where the new text was inserted.
+        * ``new_text`` is the text that was inserted, or an empty string if
+          ``kind`` is ``'delete'``.
+
+        The indexes are valid in the text as it was *before* the change. For
+        example:
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.on_change.connect(print)
+        >>> text.insert(text.end, 'hello world')
+        TextChange(kind='insert', start=TextIndex(line=1, column=0), \
+end=TextIndex(line=1, column=0), new_text='hello world')
+        >>> text.replace((1, 0), (1, 5), 'hi')
+        TextChange(kind='replace', start=TextIndex(line=1, column=0), \
+end=TextIndex(line=1, column=5), new_text='hi')
+
+        The callback runs for all changes, including things that the user
+        types and changes done with teek methods or Tcl code. This can be
+        used for keeping e.g. a Python data structure up to date with the
+        text in the widget without looking at all of the text every time
+        something changes. However, undoing and redoing (see ``edit undo``
+        and ``edit redo`` in :man:`text(3tk)`) are reported as replacing
+        all of the text.
+
+        If the widget has :meth:`peers <create_peer>`, this callback is
+        shared with them, and the indexes are relative to the widget that the
+        change was done with.
+
+        This is implemented by replacing the widget's Tcl command with a
+        command that looks at things like ``pathName insert`` before passing
+        them to the real widget command.
+        """
+        if self._shared.on_change is None:
+            self._shared.on_change = tk.Callback()
+
+            # changes done with any peer's widget command must be noticed
+            for widget in self._shared.widgets:
+                widget._track_changes()
+
+        return self._shared.on_change
+
     def _repr_parts(self):
         return ['contains %d lines of text' % self.end.line]
 
@@ -319,6 +781,19 @@ class Text(ChildMixin, Widget):
 
         return self.TextIndex(*index).between_start_end()
 
+    # like _get_index_obj, but for many indexes, and checking the end of the
+    # widget only once instead of doing it for every index
+    def _get_index_objs(self, indexes):
+        start = self.start
+        end = self.end
+        result = []
+        for index in indexes:
+            if isinstance(index, str):
+                # will raise an error
+                self._get_index_obj(index)
+            result.append(min(max(self.TextIndex(*index), start), end))
+        return result
+
     @make_thread_safe
     def get_tag(self, name):
         """Return a tag object by name, creating a new one if needed."""
@@ -373,6 +848,346 @@ class Text(ChildMixin, Widget):
 
         return self._call(str, self, 'get', index1, index2)
 
+    @property
+    @make_thread_safe
+    def line_count(self):
+        """The number of lines in the text widget.
+
+        This is always at least 1, because an empty text widget contains one
+        empty line. Note that this changes when the text changes.
+
+        If :attr:`on_change` has been used (for example, by
+        :mod:`teek.extras.highlighting`), the number of lines is updated as
+        the text changes, and getting this doesn't call Tcl at all. Otherwise
+        this does the same thing as ``text.end.line``.
+        """
+        shared = self._shared
+        # peers with startline or endline contain fewer lines
+        if shared.on_change is None or len(shared.widgets) > 1:
+            return self.end.line
+        if shared.line_count is None:
+            shared.line_count = self.end.line
+        return shared.line_count
+
+    @make_thread_safe
+    def get_lines(self, first=1, last=None):
+        """Return a list of lines of text, without the ``\\n`` characters.
+
+        The ``first`` and ``last`` arguments are line numbers, and the lines
+        between them are included, so ``text.get_lines(2, 3)`` returns the
+        second and third lines. By default, all lines are returned. Lines
+        that don't exist are left out silently.
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.insert(text.end, 'a\\nb\\nc')
+        >>> text.get_lines()
+        ['a', 'b', 'c']
+        >>> text.get_lines(2, 1000)
+        ['b', 'c']
+
+        This gets all the lines with one Tcl call, which is much faster than
+        getting each line separately.
+        """
+        if last is None:
+            end = 'end'
+        elif last < first:
+            return []
+        else:
+            end = '%d.0' % (last + 1)
+
+        # tk puts a \n after the last line, so the result always ends with
+        # \n, even if the end is beyond the last line
+        text = self._call(str, self, 'get', '%d.0' % max(first, 1), end)
+        return text.split('\n')[:-1]
+
+    @make_thread_safe
+    def replace_lines(self, first, last, lines):
+        """Replace the lines between line numbers ``first`` and ``last``.
+
+        The ``lines`` should be an iterable of strings without ``\\n``
+        characters. For example, ``text.replace_lines(2, 3, ['x'])`` replaces
+        the second and third lines with one line that contains ``x``:
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.insert(text.end, 'a\\nb\\nc\\nd')
+        >>> text.replace_lines(2, 3, ['x'])
+        >>> text.get_lines()
+        ['a', 'x', 'd']
+
+        Use ``last = first - 1`` for inserting lines without replacing
+        anything. For example, ``text.replace_lines(1, 0, lines)`` adds lines
+        to the beginning and ``text.replace_lines(text.line_count + 1,
+        text.line_count, lines)`` adds lines to the end.
+        """
+        lines = list(lines)
+        if first < 1 or last < first - 1:
+            raise ValueError("invalid line numbers: first=%r, last=%r"
+                             % (first, last))
+
+        # the last line needs special-casing because tk's invisible newline
+        # after it can't be deleted, just like in set_content()
+        line_count = self.line_count
+        if last < line_count:
+            start = '%d.0' % first
+            end = '%d.0' % (last + 1)
+            new_text = ''.join(line + '\n' for line in lines)
+        else:
+            end = 'end - 1 char'
+            new_text = '\n'.join(lines)
+            if first > line_count:
+                if not lines:
+                    return
+                start = end
+                new_text = '\n' + new_text
+            elif lines or first == 1:
+                start = '%d.0' % first
+            else:
+                # delete the \n before the deleted lines too
+                start = '%d.end' % (first - 1)
+
+        self._call(None, self, 'replace', start, end, new_text)
+
+    def _get_existing_tag(self, name):
+        # like get_tag(), but doesn't create the tag in Tcl because it's
+        # known to exist already
+        try:
+            return self._tag_objects[name]
+        except KeyError:
+            tag = self._tag_objects[name] = Tag(self, name)
+            return tag
+
+    @make_thread_safe
+    def dump(self, index1=None, index2=None, *,
+             kinds=('text', 'mark', 'tag')):
+        """Return the content, marks and tags between two indexes.
+
+        This calls ``pathName dump`` documented in :man:`text(3tk)` once, and
+        returns a list of ``(kind, value, index)`` tuples in the order that
+        they appear in the text widget:
+
+        * ``('text', string, index)`` is some text that starts at the index.
+        * ``('mark', mark_name, index)`` means that a mark is at the index.
+        * ``('tagon', tag, index)`` and ``('tagoff', tag, index)`` mean that a
+          :ref:`tag object <textwidget-tags>` is added to text starting or
+          ending at the index.
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.insert(text.start, 'hello world')
+        >>> text.get_tag('bold').add((1, 0), (1, 5))
+        >>> text.dump(kinds=['text', 'tag'])  # doctest: +NORMALIZE_WHITESPACE
+        [('tagon', <Text widget tag 'bold'>, TextIndex(line=1, column=0)),
+         ('text', 'hello', TextIndex(line=1, column=0)),
+         ('tagoff', <Text widget tag 'bold'>, TextIndex(line=1, column=5)),
+         ('text', ' world', TextIndex(line=1, column=5))]
+
+        The indexes default to :attr:`start` and :attr:`end`. ``kinds`` can be
+        any iterable of ``'text'``, ``'mark'``, ``'tag'``, ``'image'`` and
+        ``'window'`` strings, and it tells which things to include in the
+        result. Images and windows are returned as their names.
+        """
+        if index1 is None:
+            index1 = self.start
+        else:
+            index1 = self._get_index_obj(index1)
+
+        if index2 is None:
+            index2 = self.end
+        else:
+            index2 = self._get_index_obj(index2)
+
+        options = ['-' + kind for kind in kinds]
+        if not options:
+            return []
+
+        end = self.end
+        flat = self._call([str], self, 'dump', *options, index1, index2)
+
+        result = []
+        for key, value, index_string in zip(*[iter(flat)] * 3):
+            # parsing the indexes here is much faster than TextIndex.from_tcl
+            # because 'line.column' is the only format that dump gives
+            index = min(self.TextIndex(*map(int, index_string.split('.'))),
+                        end)
+            if key in ('tagon', 'tagoff'):
+                value = self._get_existing_tag(value)
+            result.append((key, value, index))
+        return result
+
+    def _search_all(self, pattern, index1, index2, regexp, nocase, *tag):
+        if index1 is None:
+            index1 = self.start
+        else:
+            index1 = self._get_index_obj(index1)
+
+        if index2 is None:
+            index2 = self.end
+        else:
+            index2 = self._get_index_obj(index2)
+
+        options = []
+        if regexp:
+            options.append('-regexp')
+        if nocase:
+            options.append('-nocase')
+
+        end = self.end
+        flat_pairs = (
+            min(self.TextIndex(*map(int, string.split('.'))), end)
+            for string in self._call(
+                [str], 'apply', _SEARCH_ALL_LAMBDA, self, index1, index2,
+                options, pattern, *tag))
+        return list(zip(flat_pairs, flat_pairs))
+
+    @make_thread_safe
+    def search_all(self, pattern, index1=None, index2=None, *,
+                   regexp=False, nocase=False):
+        """Find all matches of ``pattern`` between two indexes.
+
+        This returns a list of ``(start_index, end_index)`` pairs, just like
+        ``some_tag.ranges()`` does. All matches are found with one
+        ``pathName search -all`` call, documented in :man:`text(3tk)`.
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.insert(text.start, 'asd toot\\nToot')
+        >>> text.search_all('toot')  # doctest: +NORMALIZE_WHITESPACE
+        [(TextIndex(line=1, column=4), TextIndex(line=1, column=8))]
+        >>> len(text.search_all('t[aeiou]+t', regexp=True, nocase=True))
+        2
+
+        The indexes default to :attr:`start` and :attr:`end`. If
+        ``regexp=True`` is given, the pattern is a Tcl regular expression
+        instead of a string to search for as is; see :man:`re_syntax(3tcl)`.
+        If ``nocase=True`` is given, the search is case-insensitive.
+        """
+        return self._search_all(pattern, index1, index2, regexp, nocase)
+
+    @make_thread_safe
+    def highlight_all(self, tag, pattern, index1=None, index2=None, *,
+                      regexp=False, nocase=False):
+        """Add a tag to all matches of ``pattern``.
+
+        The ``tag`` can be a tag object or a tag name string, and other
+        arguments work like in :meth:`search_all`. This returns the same list
+        that :meth:`search_all` returns, but all matches are also tagged in
+        the same Tcl call.
+        """
+        return self._search_all(pattern, index1, index2, regexp, nocase, tag)
+
+    @make_thread_safe
+    def load_stream(self, source, index=None, *, tag_list=(),
+                    chunk_size=64 * 1024, budget_ms=20):
+        """Insert text from a file or an iterable gradually.
+
+        Inserting a huge string with :meth:`insert` freezes the GUI until
+        everything has been inserted, and the whole string must be in memory
+        at once. With this method, the text is read and inserted in chunks of
+        about ``chunk_size`` characters, and the event loop gets to run
+        between them, so the GUI stays responsive and the widget can be
+        scrolled while loading.
+
+        The ``source`` can be a file object opened in text mode, or any
+        iterable of strings, such as a list of lines. The text is inserted to
+        ``index`` (which defaults to :attr:`end`), and it will have the tags
+        in ``tag_list``, just like with :meth:`insert`. Text is inserted at
+        most ``budget_ms`` milliseconds at a time before letting Tk do other
+        things. Nothing is loaded until the event loop runs.
+
+        This returns a loader object that has these attributes and methods:
+
+        * ``loader.cancel()`` stops loading.
+        * ``loader.characters_loaded`` is the number of characters inserted
+          so far.
+        * ``loader.on_progress`` is a :class:`.Callback` that runs with
+          ``loader.characters_loaded`` as an argument when more text has
+          been loaded.
+        * ``loader.on_done`` is a :class:`.Callback` that runs with no
+          arguments when everything has been loaded.
+
+        The file is not closed automatically, so don't use this inside a
+        ``with`` statement that closes the file right away. Do something like
+        ``loader.on_done.connect(file.close)`` instead.
+        """
+        if index is None:
+            index = self.end
+        else:
+            index = self._get_index_obj(index)
+
+        # the mark moves as text is inserted before it, so new chunks go to
+        # the correct place even if the user edits the text while loading
+        mark = 'teek_load_stream_%d' % next(counts['marks'])
+        self._call(None, self, 'mark', 'set', mark, index)
+        self._call(None, self, 'mark', 'gravity', mark, 'right')
+        return _StreamLoader(self, _read_chunks(source, chunk_size), mark,
+                             tag_list, budget_ms)
+
+    @make_thread_safe
+    def set_content(self, new_text, *, strategy='diff'):
+        """Replace all text in the widget with ``new_text``.
+
+        With ``strategy='replace'``, this does the same thing as
+        ``text.replace(text.start, text.end, new_text)``. That's simple, but
+        everything is deleted and inserted again, so marks and tags are lost,
+        the view scrolls, and Tk needs to do a lot of work with big texts.
+
+        With the default ``strategy='diff'``, this compares the old and new
+        text line by line with :mod:`difflib`, and then replaces only the
+        lines that changed, all in one Tcl call. This is much faster if only a
+        few lines change, and the rest of the text stays untouched.
+
+        >>> text = tk.Text(tk.Window())
+        >>> text.insert(text.end, 'a\\nb\\nc')
+        >>> text.on_change.connect(print)
+        >>> text.set_content('a\\nB\\nc')    # doctest: +NORMALIZE_WHITESPACE
+        TextChange(kind='replace', start=TextIndex(line=2, column=0),
+                   end=TextIndex(line=3, column=0), new_text='B\\n')
+        """
+        if strategy == 'replace':
+            self.replace(self.start, self.end, new_text)
+            return
+        if strategy != 'diff':
+            raise ValueError("unknown strategy %r" % (strategy,))
+
+        old_lines = self.get().split('\n')
+        new_lines = new_text.split('\n')
+        opcodes = difflib.SequenceMatcher(
+            None, old_lines, new_lines).get_opcodes()
+
+        # tk sees the text as lines that all end with \n, including the last
+        # line, which has the invisible newline at the end that can't be
+        # deleted, so the last line needs special-casing
+        replacements = []
+        for opcode, old_first, old_end, new_first, new_end in opcodes:
+            if opcode == 'equal':
+                continue
+
+            if old_end < len(old_lines):
+                start = '%d.0' % (old_first + 1)
+                end = '%d.0' % (old_end + 1)
+                replacement = ''.join(line + '\n'
+                                      for line in new_lines[new_first:new_end])
+            else:
+                # the end of this is also the end of new_lines
+                end = 'end - 1 char'
+                replacement = '\n'.join(new_lines[new_first:new_end])
+                if old_first == len(old_lines):
+                    # add lines after the last line
+                    start = end
+                    replacement = '\n' + replacement
+                elif new_first == new_end:
+                    # delete the last lines and the \n before them
+                    start = '%d.%d' % (old_first,
+                                       len(old_lines[old_first - 1]))
+                else:
+                    start = '%d.0' % (old_first + 1)
+
+            # replacing from end to start keeps line numbers of the parts that
+            # haven't been replaced yet correct
+            replacements[0:0] = [start, end, replacement]
+
+        if replacements:
+            self._call(None, 'apply', _MULTI_REPLACE_LAMBDA,
+                       self, replacements)
+
     @make_thread_safe
     def insert(self, index, text, tag_list=()):
         """Add text to the widget.
@@ -0,0 +1,350 @@
+import bisect
+import collections.abc
+import queue
+import re
+import sys
+import threading
+import time
+import traceback
+
+import teek as tk
+from teek._tcl_calls import _get_interp
+
+# results are added to the text widget this many lines at a time, so that a
+# batch with lots of tokens doesn't freeze the GUI
+_APPLY_LINES = 20
+
+# the worker thread gets at most this many batches at a time, so that it
+# doesn't get far ahead of what the text widget contains
+_MAX_BATCHES = 10
+
+
+def _regex_tokenizer(tag_patterns):
+    if isinstance(tag_patterns, collections.abc.Mapping):
+        tag_patterns = tag_patterns.items()
+
+    # the tag names can be anything, so they can't be used as group names
+    tag_names = collections.OrderedDict()
+    regex_parts = []
+    for number, (tag_name, pattern) in enumerate(tag_patterns):
+        group_name = 'teek_tag_%d' % number
+        tag_names[group_name] = tag_name
+        regex_parts.append('(?P<%s>%s)' % (group_name, pattern))
+    regex = re.compile('|'.join(regex_parts))
+
+    def tokenizer(line):
+        for match in regex.finditer(line):
+            if match.start() != match.end():
+                yield (tag_names[match.lastgroup], match.start(), match.end())
+
+    return tokenizer, list(tag_names.values())
+
+
+# a sorted list of non-overlapping (first, last) inclusive line number ranges,
+# much more compact than a set of line numbers when e.g. all lines of a big
+# file need highlighting
+class _LineRanges:
+
+    def __init__(self):
+        self._ranges = []
+
+    def __bool__(self):
+        return bool(self._ranges)
+
+    def add(self, first, last):
+        # find all ranges that overlap or touch first..last and merge them
+        start = bisect.bisect_left(self._ranges, (first, first))
+        if start > 0 and self._ranges[start - 1][1] >= first - 1:
+            start -= 1
+        end = start
+        while end < len(self._ranges) and self._ranges[end][0] <= last + 1:
+            end += 1
+
+        if start != end:
+            first = min(first, self._ranges[start][0])
+            last = max(last, self._ranges[end - 1][1])
+        self._ranges[start:end] = [(first, last)]
+
+    # lines between first and last are deleted, and lines after last move by
+    # line_diff
+    def delete_and_shift(self, first, last, line_diff):
+        result = []
+        for range_first, range_last in self._ranges:
+            if range_first < first:
+                result.append((range_first, min(range_last, first - 1)))
+            if range_last > last:
+                result.append((max(range_first, last + 1) + line_diff,
+                               range_last + line_diff))
+        self._ranges.clear()
+        for range_first, range_last in result:
+            self.add(range_first, range_last)
+
+    def discard_after(self, line):
+        self.delete_and_shift(line + 1, float('inf'), 0)
+
+    # returns a contiguous (first, last) range of at most max_count lines,
+    # starting at the first line after the given line if possible
+    def pop(self, near_line, max_count):
+        i = bisect.bisect_left(self._ranges, (near_line, near_line))
+        if i > 0 and self._ranges[i - 1][1] >= near_line:
+            i -= 1
+            first = near_line
+        elif i < len(self._ranges):
+            first = self._ranges[i][0]
+        else:
+            i = 0
+            first = self._ranges[0][0]
+
+        range_first, range_last = self._ranges[i]
+        last = min(range_last, first + max_count - 1)
+
+        replacement = []
+        if range_first < first:
+            replacement.append((range_first, first - 1))
+        if last < range_last:
+            replacement.append((last + 1, range_last))
+        self._ranges[i:i + 1] = replacement
+        return (first, last)
+
+
+class _Batch:
+
+    def __init__(self, first_line, lines):
+        self.first_line = first_line
+        self.lines = lines
+        self.tokens = None          # set in the worker thread
+        self.applied_count = 0      # number of lines added to the text widget
+        self.cancelled = False
+
+    @property
+    def last_line(self):
+        return self.first_line + len(self.lines) - 1
+
+
+class _Highlighter:
+
+    def __init__(self, textwidget, tokenizer, budget_ms, batch_size):
+        self._textwidget = textwidget
+        if callable(tokenizer):
+            self._tokenizer = tokenizer
+            tag_names = []
+        else:
+            self._tokenizer, tag_names = _regex_tokenizer(tokenizer)
+
+        # creating the tags here makes their stacking order predictable, see
+        # some_tag.raise_() in the text widget docs
+        self._tag_names = set(tag_names)
+        for tag_name in tag_names:
+            textwidget.get_tag(tag_name)
+        self._budget = budget_ms / 1000
+        self._batch_size = batch_size
+
+        self._dirty_lines = _LineRanges()
+        self._batches = []      # sent to the worker but not applied yet
+        self._applying = None   # the batch from _results being applied
+        self._jobs = queue.Queue()
+        self._results = collections.deque()     # accessed in event loop only
+        self._timeout = None
+        self._stopped = False
+
+        threading.Thread(target=self._worker, daemon=True).start()
+
+        textwidget.on_change.connect(self._on_change)
+        textwidget.bindings['<Destroy>'].connect(self._on_destroy)
+        self._dirty_lines.add(1, textwidget.end.line)
+        self._schedule()
+
+    # this runs in a separate thread, and must not do anything with teek
+    # except calling _deliver()
+    def _worker(self):
+        while True:
+            # everything that is waiting is delivered with one call, because
+            # each _deliver() call waits for the event loop
+            batches = [self._jobs.get()]
+            while True:
+                try:
+                    batches.append(self._jobs.get(block=False))
+                except queue.Empty:
+                    break
+            if None in batches:
+                break
+
+            for batch in batches:
+                # cancelled batches are delivered too, so that the event loop
+                # knows that they are no longer in the worker
+                if not batch.cancelled:
+                    batch.tokens = list(map(self._tokenize, batch.lines))
+
+            try:
+                self._deliver(batches)
+            except RuntimeError:
+                # tk.quit() was called, init_threads() is no longer in effect
+                break
+
+    def _tokenize(self, line):
+        try:
+            return list(self._tokenizer(line))
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            return []
+
+    # this runs in the event loop, so the worker doesn't need to be polled
+    @tk.make_thread_safe
+    def _deliver(self, batches):
+        if not self._stopped:
+            self._results.extend(batches)
+            self._schedule()
+
+    def _on_change(self, change):
+        first, last, new_text = change.start, change.end, change.new_text
+        new_last_line = first.line + new_text.count('\n')
+        line_diff = new_last_line - last.line
+
+        for batch in self._batches:
+            if batch.first_line <= last.line and batch.last_line >= first.line:
+                batch.cancelled = True
+                self._dirty_lines.add(batch.first_line, batch.last_line)
+            elif batch.first_line > last.line:
+                batch.first_line += line_diff
+
+        self._dirty_lines.delete_and_shift(first.line, last.line, line_diff)
+        self._dirty_lines.add(first.line, new_last_line)
+        self._schedule()
+
+    def _schedule(self):
+        if self._timeout is None:
+            self._timeout = tk.after_idle(self._step)
+
+    def _step(self):
+        self._timeout = None
+        deadline = time.perf_counter() + self._budget
+
+        while time.perf_counter() < deadline:
+            if self._applying is None:
+                if not self._results:
+                    break
+                self._applying = self._results.popleft()
+
+            batch = self._applying
+            if not batch.cancelled:
+                self._apply_some(batch)
+            if batch.cancelled or batch.applied_count == len(batch.lines):
+                self._batches.remove(batch)
+                self._applying = None
+
+        while self._dirty_lines and len(self._batches) < _MAX_BATCHES:
+            self._send_batch()
+
+        # the worker's results are waited with _deliver(), not here
+        if self._applying is not None or self._results:
+            # 1ms, so that tk gets a chance to handle events in between
+            self._timeout = tk.after(1, self._step)
+
+    def _send_batch(self):
+        end_line = self._textwidget.line_count
+        self._dirty_lines.discard_after(end_line)
+        if not self._dirty_lines:
+            return
+
+        # lines visible on the screen get highlighted first
+        view_start, view_end = self._textwidget.yview()
+        first, last = self._dirty_lines.pop(
+            int(view_start * end_line) + 1, self._batch_size)
+
+        batch = _Batch(first, self._textwidget.get_lines(first, last))
+        self._batches.append(batch)
+        self._jobs.put(batch)
+
+    def _apply_some(self, batch):
+        start = batch.applied_count
+        end = min(start + _APPLY_LINES, len(batch.lines))
+
+        ranges = {name: [] for name in self._tag_names}
+        for index in range(start, end):
+            line_number = batch.first_line + index
+            for tag_name, start_column, end_column in batch.tokens[index]:
+                ranges.setdefault(tag_name, []).append(
+                    ((line_number, start_column), (line_number, end_column)))
+
+        self._tag_names.update(ranges.keys())
+        lines = [((batch.first_line + start, 0), (batch.first_line + end, 0))]
+        for tag_name, tag_ranges in ranges.items():
+            tag = self._textwidget.get_tag(tag_name)
+            tag.remove_ranges(lines)
+            tag.add_ranges(tag_ranges)
+        batch.applied_count = end
+
+    def _on_destroy(self, event):
+        # the binding goes away with the widget
+        self.stop(destroying=True)
+
+    def stop(self, *, destroying=False):
+        if self._stopped:
+            return
+        self._stopped = True
+
+        if self._timeout is not None:
+            self._timeout.cancel()
+            self._timeout = None
+
+        for batch in self._batches:
+            batch.cancelled = True
+        self._jobs.put(None)
+        self._textwidget.on_change.disconnect(self._on_change)
+
+        if not destroying:
+            self._textwidget.bindings['<Destroy>'].disconnect(
+                self._on_destroy)
+            for tag_name in self._tag_names:
+                self._textwidget.get_tag(tag_name).remove()
+
+
+@tk.make_thread_safe
+def set_highlighter(textwidget, tokenizer, *, budget_ms=5, batch_size=200):
+    """Highlight the content of a :class:`teek.Text` widget as it changes.
+
+    The ``tokenizer`` can be a dictionary like
+    ``{'keyword': r'\\b(if|else)\\b', 'comment': r'#.*'}``, where the keys are
+    tag names and the values are regular expressions that match the text that
+    should get the tag. If several regexes match at the same place, the first
+    one wins. Use an iterable of ``(tag_name, regex)`` pairs instead of a dict
+    if you want.
+
+    Alternatively, ``tokenizer`` can be a function that takes a line of text as
+    a string (without the trailing ``\\n``) and returns an iterable of
+    ``(tag_name, start_column, end_column)`` tuples. The function is called
+    from a separate thread, so it must not do anything with teek.
+
+    The highlighting is done one line at a time, so things that span multiple
+    lines (e.g. multiline strings) can't be highlighted. Use
+    :meth:`~teek.Text.get_tag` to configure how the tags look::
+
+        text.get_tag('keyword')['foreground'] = 'orange'
+
+    When the text changes, only the changed lines are highlighted again. The
+    lines are tokenized in a thread, and the results are added to the text
+    widget in batches of at most ``batch_size`` lines. The results are added a
+    few lines at a time, and at most ``budget_ms`` milliseconds is spent
+    adding them before Tk gets to handle other events, so that the GUI
+    doesn't freeze with big files. Lines that are visible on the screen are
+    highlighted first.
+
+    Calling this again with the same text widget replaces the old tokenizer
+    with the new one, and ``set_highlighter(textwidget, None)`` turns off the
+    highlighting and removes the highlighting tags.
+
+    The thread gives the results to the event loop with
+    :func:`teek.make_thread_safe`, so :func:`teek.init_threads` must be called
+    before using this. :exc:`RuntimeError` is raised if it wasn't called.
+    """
+    if tokenizer is not None and not _get_interp()._init_threads_called:
+        raise RuntimeError("init_threads() wasn't called")
+
+    old_highlighter = getattr(textwidget, '_highlighter', None)
+    if old_highlighter is not None:
+        old_highlighter.stop()
+        textwidget._highlighter = None
+
+    if tokenizer is not None:
+        textwidget._highlighter = _Highlighter(
+            textwidget, tokenizer, budget_ms, batch_size)
@@ -1,12 +1,78 @@
 import functools
+import itertools
 import webbrowser
 
 _TAG_PREFIX = 'teek-extras-link-'
+_COMMON_TAG = _TAG_PREFIX + 'common'
+_link_names = map((_TAG_PREFIX + '{}').format, itertools.count(1))
+
+# every link has two marks, NAME-start and NAME-end, so that links keep working
+# when the text is edited. The start mark has right gravity and the end mark
+# has left gravity, so that text inserted just before or after a link doesn't
+# become a part of it. The start mark is set after inserting and the end mark
+# is set before inserting, so that the marks end up around the inserted text.
+_ADD_LINK_LAMBDA = '''{widget index text tags name} {
+    $widget mark set $name-end $index
+    $widget insert $index $text $tags
+    $widget mark set $name-start $index
+    $widget mark gravity $name-end left
+}'''
+
+# finds the link that was clicked, and returns its name or an empty string
+#
+# 'mark previous' uses tk's b-tree, so this usually finds the link right away
+# without looking at other links. It may find links after the clicked character
+# too, and a link can be added inside another link, in which case the inner
+# link is clicked.
+_FIND_LINK_LAMBDA = '''{widget prefix} {
+    set mark [$widget mark previous "current + 1 char"]
+    while {$mark ne ""} {
+        if {[string match "${prefix}*-start" $mark]} {
+            set name [string range $mark 0 end-6]
+            set start [$widget index $name-start]
+            set end [$widget index $name-end]
+            if {[$widget compare $start <= current] &&
+                    [$widget compare current < $end]} {
+                return $name
+            }
+        }
+        set mark [$widget mark previous $mark]
+    }
+    return ""
+}'''
+
+# removes the marks of links whose text was deleted, and returns their names
+#
+# when text is deleted or replaced, the end marks of the deleted links end up
+# at the start of the deleted text because they have left gravity, and the
+# start marks are at the same place or after the new text
+_PRUNE_LINKS_LAMBDA = '''{widget prefix} {
+    set names {}
+    foreach mark [$widget mark names] {
+        if {[string match "${prefix}*-end" $mark]} {
+            set name [string range $mark 0 end-4]
+            if {[$widget compare $name-start >= $name-end]} {
+                $widget mark unset $name-start $name-end
+                lappend names $name
+            }
+        }
+    }
+    return $names
+}'''
+
+
+def _prune_links(widget):
+    for name in widget._call([str], 'apply', _PRUNE_LINKS_LAMBDA,
+                             widget, _TAG_PREFIX):
+        del widget._link_functions[name]
+    widget._links_after_pruning = len(widget._link_functions)
 
 
 def _init_links(widget):
-    if _TAG_PREFIX + 'common' in (tag.name for tag in widget.get_all_tags()):
-        return widget.get_tag(_TAG_PREFIX + 'common')
+    try:
+        return widget._link_functions
+    except AttributeError:
+        pass
 
     old_cursor = widget.config['cursor']
 
@@ -18,12 +84,27 @@ def _init_links(widget):
     def leave():
         widget.config['cursor'] = old_cursor
 
-    tag = widget.get_tag(_TAG_PREFIX + 'common')
+    def click():
+        _prune_links(widget)
+        name = widget._call(str, 'apply', _FIND_LINK_LAMBDA,
+                            widget, _TAG_PREFIX)
+        if name:
+            # bind callbacks must return None or 'break', but this ignores
+            # the function's return value
+            widget._link_functions[name]()
+
+    # there is only one tag and one click binding for all links, so that
+    # adding many links doesn't create many tags and tcl commands
+    tag = widget.get_tag(_COMMON_TAG)
     tag['foreground'] = 'blue'
     tag['underline'] = True
     tag.bind('<Enter>', enter)
     tag.bind('<Leave>', leave)
-    return tag
+    tag.bind('<Button-1>', click)
+
+    widget._link_functions = {}     # {link name: function}
+    widget._links_after_pruning = 0
+    return widget._link_functions
 
 
 def add_function_link(textwidget, text, function, index=None):
@@ -33,22 +114,21 @@ def add_function_link(textwidget, text, function, index=None):
     """
     if index is None:
         index = textwidget.end
+    else:
+        index = textwidget._get_index_obj(index)
 
-    common_tag = _init_links(textwidget)
-
-    names = {tag.name for tag in textwidget.get_all_tags()}
-    i = 1
-    while _TAG_PREFIX + str(i) in names:
-        i += 1
-    specific_tag = textwidget.get_tag(_TAG_PREFIX + str(i))
+    link_functions = _init_links(textwidget)
 
-    # bind callbacks must return None or 'break', but this ignores the
-    # function's return value
-    def none_return_function():
-        function()
+    # links of deleted text are forgotten when a link is clicked, or when the
+    # number of links has doubled since the previous pruning, so that adding
+    # many links doesn't look through all links every time
+    if len(link_functions) >= max(2 * textwidget._links_after_pruning, 100):
+        _prune_links(textwidget)
 
-    specific_tag.bind('<Button-1>', none_return_function)
-    textwidget.insert(index, text, [common_tag, specific_tag])
+    name = next(_link_names)
+    textwidget._call(None, 'apply', _ADD_LINK_LAMBDA,
+                     textwidget, index, text, [_COMMON_TAG], name)
+    link_functions[name] = function
 
 
 def add_url_link(textwidget, text, url, index=None):
@@ -0,0 +1,302 @@
+import array
+import collections.abc
+import itertools
+import mmap
+
+import teek as tk
+
+
+class FileLines(collections.abc.Sequence):
+    """A sequence of the lines of a file, without the line endings.
+
+    The file is memory-mapped with :mod:`mmap`, so it isn't read into memory;
+    only the start of each line is stored, and lines are read and decoded
+    from the file when they are accessed. Both ``\\n`` and ``\\r\\n`` line
+    endings are supported. For example, with a file that contains
+    ``hello\\nworld\\n``::
+
+        >>> lines = FileLines(path)                   # doctest: +SKIP
+        >>> len(lines)                                # doctest: +SKIP
+        2
+        >>> lines[1]                                  # doctest: +SKIP
+        'world'
+
+    The ``encoding`` and ``errors`` arguments work like with :func:`open`,
+    but the encoding must be compatible with ASCII, e.g. UTF-8 works but UTF-16
+    doesn't. Use :meth:`close` or a ``with`` statement to close the file when
+    it's no longer needed.
+    """
+
+    # must be divisible by mmap.ALLOCATIONGRANULARITY
+    _CHUNK_SIZE = 16 * mmap.ALLOCATIONGRANULARITY
+
+    def __init__(self, path, *, encoding='utf-8', errors='replace'):
+        self._encoding = encoding
+        self._errors = errors
+        self._file = open(path, 'rb')
+        try:
+            self._size = self._file.seek(0, 2)
+            if self._size == 0:
+                # mmap can't map empty files
+                self._mmap = b''
+            else:
+                self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            self._starts = self._find_line_starts()
+        except Exception:
+            self._file.close()
+            raise
+
+    # finding the newlines one chunk at a time with bytes methods is much
+    # faster than calling mmap.find() for each line
+    def _find_line_starts(self):
+        starts = array.array('q', [0])
+        for chunk_start in range(0, self._size, self._CHUNK_SIZE):
+            chunk = self._mmap[chunk_start:chunk_start + self._CHUNK_SIZE]
+            lengths = (len(part) + 1 for part in chunk.split(b'\n')[:-1])
+            starts.extend(itertools.islice(
+                itertools.accumulate(itertools.chain([chunk_start], lengths)),
+                1, None))
+
+        # a newline at the end of the file doesn't start a new line
+        if len(starts) > 1 and starts[-1] == self._size:
+            starts.pop()
+            self._content_end = self._size - 1
+        else:
+            self._content_end = self._size
+        return starts
+
+    def __len__(self):
+        if self._size == 0:
+            return 0
+        return len(self._starts)
+
+    # \r of \r\n line endings is removed here
+    def _decode_lines(self, first, last):
+        start = self._starts[first]
+        if last + 1 < len(self._starts):
+            end = self._starts[last + 1] - 1
+        else:
+            end = self._content_end
+
+        text = self._mmap[start:end].decode(self._encoding, self._errors)
+        return [line[:-1] if line.endswith('\r') else line
+                for line in text.split('\n')]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            first, last, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(first, last, step)]
+            if first >= last:
+                return []
+
+            # one decode for all lines is faster than decoding each line
+            return self._decode_lines(first, last - 1)
+
+        if index < 0:
+            index += len(self)
+        if index not in range(len(self)):
+            raise IndexError("line number out of range")
+        return self._decode_lines(index, index)[0]
+
+    def close(self):
+        """Close the file.
+
+        The lines can't be accessed after calling this.
+        """
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.close()
+
+
+class VirtualTextView(tk.Frame):
+    """A read-only text view for huge amounts of lines.
+
+    The ``lines`` can be any sequence of strings that don't contain ``\\n``,
+    such as a list or a :class:`FileLines` object. Instead of adding all the
+    lines to the text widget, only the lines visible on the screen and
+    ``margin`` lines above and below them are added, and the content of the
+    text widget is replaced as the view is scrolled. This way the view
+    scrolls smoothly, no matter how many lines there are.
+
+    This widget is a :class:`teek.Frame` that contains these widgets:
+
+    .. attribute:: textwidget
+
+        The :class:`teek.Text` widget that shows the lines. Keyword arguments
+        are passed to it, but its ``wrap`` option must be ``'none'``, because
+        scrolling assumes that each line takes one line on the screen. Tags
+        added to the text widget are lost when it's scrolled.
+
+    .. attribute:: scrollbar
+
+        A vertical :class:`teek.Scrollbar` that shows the position in all of
+        the lines, not just in the lines that are in the text widget.
+
+    If the sequence changes, e.g. when lines are added to a list, call
+    :meth:`refresh` to update the text widget. For example::
+
+        import teek as tk
+        from teek.extras.virtual_text import FileLines, VirtualTextView
+
+        window = tk.Window()
+        with FileLines('huge.log') as lines:
+            VirtualTextView(window, lines).pack(fill='both', expand=True)
+            window.on_delete_window.connect(tk.quit)
+            tk.run()
+    """
+
+    def __init__(self, parent, lines, *, margin=100, **kwargs):
+        super().__init__(parent)
+        if kwargs.get('wrap', 'none') != 'none':
+            raise ValueError("wrap must be 'none'")
+        kwargs['wrap'] = 'none'
+
+        self._lines = lines
+        self._margin = margin
+        self._first = 0         # index of the line at the top of the view
+        self._window = (0, 0)   # start and end indexes of the rendered lines
+        self._render_timeout = None
+
+        self.textwidget = tk.Text(self, state='disabled', **kwargs)
+        self.scrollbar = tk.Scrollbar(self)
+        self.textwidget.grid(row=0, column=0, sticky='nswe')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.grid_rows[0].config['weight'] = 1
+        self.grid_columns[0].config['weight'] = 1
+
+        self.textwidget.config['yscrollcommand'].connect(self._on_text_scroll)
+        self.scrollbar.config['command'].connect(self._on_scrollbar)
+        self.textwidget.bind('<Configure>', self._schedule_render)
+        self.bind('<Destroy>', self._on_destroy)
+        self._render()
+
+    def _visible_line_count(self):
+        height = self.textwidget.winfo_height()
+        if height <= 1:
+            # not shown on the screen yet
+            return self.textwidget.config['height']
+        linespace = self.textwidget.config['font'].metrics()['linespace']
+        return max(1, height // linespace)
+
+    def _render(self):
+        if self._render_timeout is not None:
+            self._render_timeout.cancel()
+            self._render_timeout = None
+
+        total = len(self._lines)
+        visible = self._visible_line_count()
+        self._first = max(0, min(self._first, total - visible))
+        start = max(0, self._first - self._margin)
+        end = min(total, self._first + visible + self._margin)
+        self._window = (start, end)
+
+        xview_start = self.textwidget.xview()[0]
+        self.textwidget.config['state'] = 'normal'
+        self.textwidget.replace(self.textwidget.start, self.textwidget.end,
+                                '\n'.join(self._lines[start:end]))
+        self.textwidget.config['state'] = 'disabled'
+        self.textwidget.yview(
+            self.textwidget.TextIndex(self._first - start + 1, 0))
+        self.textwidget.xview('moveto', xview_start)
+        self._update_scrollbar(visible)
+
+    def _schedule_render(self):
+        if self._render_timeout is None:
+            self._render_timeout = tk.after_idle(self._render_later)
+
+    def _render_later(self):
+        self._render_timeout = None
+        self._render()
+
+    def _update_scrollbar(self, visible):
+        total = len(self._lines)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._first / total,
+                               min(self._first + visible, total) / total)
+
+    # runs when the text widget was scrolled with e.g. the mouse wheel, or
+    # when the scrollbar told the text widget to scroll
+    def _on_text_scroll(self, first_fraction, last_fraction):
+        start, end = self._window
+        top_line = self.textwidget.TextIndex.from_tcl('@0,0').line
+        self._first = start + top_line - 1
+
+        visible = self._visible_line_count()
+        self._update_scrollbar(visible)
+
+        # render more lines before reaching the start or end of what is
+        # rendered, so that scrolling doesn't stop
+        if ((start > 0 and self._first - start < self._margin // 2) or
+                (end < len(self._lines) and
+                 end - (self._first + visible) < self._margin // 2)):
+            self._schedule_render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            [fraction] = args
+            self._first = int(fraction * len(self._lines))
+            self._render()
+            return
+
+        number, units_or_pages = args
+        if units_or_pages == 'pages':
+            number *= self._visible_line_count()
+
+        new_first = self._first + number
+        start, end = self._window
+        visible = self._visible_line_count()
+        if start <= new_first and new_first + visible <= end:
+            # the lines are in the text widget already, so the text widget
+            # can scroll smoothly by itself
+            self.textwidget.yview('scroll', number, 'units')
+        else:
+            self._first = new_first
+            self._render()
+
+    def _on_destroy(self):
+        if self._render_timeout is not None:
+            self._render_timeout.cancel()
+            self._render_timeout = None
+
+    @property
+    def lines(self):
+        """The sequence of lines passed to :class:`VirtualTextView`.
+
+        Setting this to a new sequence scrolls to the beginning and shows the
+        new lines.
+        """
+        return self._lines
+
+    @lines.setter
+    def lines(self, new_lines):
+        self._lines = new_lines
+        self._first = 0
+        self._render()
+
+    @property
+    def first_line(self):
+        """The index of the line at the top of the view in :attr:`lines`."""
+        return self._first
+
+    def see(self, line_index):
+        """Scroll so that ``lines[line_index]`` is at the top of the view."""
+        self._first = line_index
+        self._render()
+
+    def refresh(self):
+        """Update the text widget after :attr:`lines` has changed.
+
+        This keeps the current scroll position, unless there are less lines
+        than before.
+        """
+        self._render()
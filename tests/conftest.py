@@ -1,4 +1,5 @@
 import contextlib
+import time
 
 import pytest
 
@@ -47,6 +48,21 @@ def deinit_threads():
     tk.run()
 
 
+@pytest.fixture
+def run_event_loop():
+    """Return a function that runs the event loop for some milliseconds.
+
+    This doesn't use tk.run() and tk.quit(), because tk.quit() would destroy
+    all widgets that the test created.
+    """
+    def runner(ms):
+        end = time.perf_counter() + ms / 1000
+        while time.perf_counter() < end:
+            tk.update()
+
+    return runner
+
+
 @pytest.fixture
 def handy_callback():
     def handy_callback_decorator(function):
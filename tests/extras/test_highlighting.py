@@ -0,0 +1,135 @@
+
+import pytest
+
+import teek as tk
+from teek.extras import highlighting
+from teek.extras.highlighting import _LineRanges
+
+
+TABLE = {'keyword': r'\b(if|else)\b', 'comment': r'#.*'}
+
+
+def test_regex_table(deinit_threads, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'if x:  # lol\n    y\nelse:\n    z  # else\n')
+    highlighting.set_highlighter(text, TABLE)
+    run_event_loop(200)
+
+    assert text.get_tag('keyword').ranges() == [((1, 0), (1, 2)),
+                                                ((3, 0), (3, 4))]
+    assert text.get_tag('comment').ranges() == [((1, 7), (1, 12)),
+                                                ((4, 7), (4, 13))]
+
+
+def test_changes_and_callable_tokenizer(deinit_threads, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'a\nb\nc')
+    tokenized = []
+
+    def tokenizer(line):
+        tokenized.append(line)
+        if line.startswith('x'):
+            yield ('x-tag', 0, len(line))
+
+    highlighting.set_highlighter(text, tokenizer)
+    run_event_loop(200)
+    assert sorted(tokenized) == ['a', 'b', 'c']
+    assert text.get_tag('x-tag').ranges() == []
+
+    # only the changed lines get tokenized again
+    tokenized.clear()
+    text.insert((2, 0), 'xx')
+    text.insert(text.end, '\nxyz')
+    run_event_loop(200)
+    assert sorted(tokenized) == ['c', 'xxb', 'xyz']
+    assert text.get_tag('x-tag').ranges() == [((2, 0), (2, 3)),
+                                              ((4, 0), (4, 3))]
+
+    # lines below the change must move down nicely
+    text.insert(text.start, 'new line\n')
+    text.delete((3, 0), (3, 1))
+    run_event_loop(200)
+    assert text.get_tag('x-tag').ranges() == [((3, 0), (3, 2)),
+                                              ((5, 0), (5, 3))]
+
+    highlighting.set_highlighter(text, None)
+    assert text.get_tag('x-tag').ranges() == []
+    tokenized.clear()
+    text.insert(text.end, '\nxxx')
+    run_event_loop(100)
+    assert tokenized == []
+
+
+def test_tokenizer_error(deinit_threads, capsys, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'hello')
+    highlighting.set_highlighter(text, lambda line: 1 / 0)
+    run_event_loop(200)
+
+    output, errors = capsys.readouterr()
+    assert 'ZeroDivisionError' in errors
+
+
+def test_replacing_and_destroying(deinit_threads, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    destroy_bindings = text.bindings['<Destroy>']._connections
+    highlighting.set_highlighter(text, TABLE)
+    highlighting.set_highlighter(text, TABLE)
+    assert len(destroy_bindings) == 1
+    highlighting.set_highlighter(text, None)
+    assert not destroy_bindings
+
+    highlighting.set_highlighter(text, TABLE)
+    text.destroy()
+    run_event_loop(50)
+
+
+def test_many_tokens_in_a_batch(deinit_threads, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'if else ' * 100 + '\n' + 'if\n' * 99)
+    highlighting.set_highlighter(text, TABLE, batch_size=100)
+
+    # the tokens aren't all added at once, but they get added eventually
+    run_event_loop(200)
+    ranges = text.get_tag('keyword').ranges()
+    assert len(ranges) == 200 + 99
+    assert ranges[-1] == ((100, 0), (100, 2))
+
+
+@pytest.mark.slow
+def test_big_file(deinit_threads, run_event_loop):
+    tk.init_threads()
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'if x:  # comment\n' * 20000)
+    highlighting.set_highlighter(text, TABLE)
+    run_event_loop(5000)
+    assert len(text.get_tag('keyword').ranges()) == 20000
+
+
+def test_init_threads_not_called():
+    with pytest.raises(RuntimeError):
+        highlighting.set_highlighter(tk.Text(tk.Window()), TABLE)
+    highlighting.set_highlighter(tk.Text(tk.Window()), None)
+
+
+def test_line_ranges():
+    ranges = _LineRanges()
+    assert not ranges
+    ranges.add(1, 10)
+    ranges.add(20, 30)
+    ranges.add(11, 12)
+    assert ranges._ranges == [(1, 12), (20, 30)]
+
+    assert ranges.pop(5, 3) == (5, 7)
+    assert ranges.pop(100, 5) == (1, 4)     # wraps around
+    assert ranges._ranges == [(8, 12), (20, 30)]
+
+    ranges.delete_and_shift(10, 21, -5)
+    assert ranges._ranges == [(8, 9), (17, 25)]
+    ranges.discard_after(20)
+    assert ranges._ranges == [(8, 9), (17, 20)]
@@ -5,6 +5,11 @@ import teek as tk
 from teek.extras import links
 
 
+def click(text, index):
+    text.marks['current'] = index
+    text.get_tag('teek-extras-link-common').bindings['<1>'].run(None)
+
+
 def test_links_clicking():
     text = tk.Text(tk.Window())
 
@@ -15,14 +20,73 @@ def test_links_clicking():
         text, '123', functools.partial(stuff.append, 2), (1, 2))
     assert text.get() == 'ab123c'
 
-    all_tag_names = (tag.name for tag in text.get_all_tags())
-    assert {'teek-extras-link-1',
-            'teek-extras-link-2',
-            'teek-extras-link-common'}.issubset(all_tag_names)
+    # all links share the same tag
+    assert [tag.name for tag in text.get_all_tags()].count(
+        'teek-extras-link-common') == 1
+    assert not any(tag.name.startswith('teek-extras-link-')
+                   and tag.name != 'teek-extras-link-common'
+                   for tag in text.get_all_tags())
+
+    for index, result in [((1, 0), 1), ((1, 1), 1), ((1, 2), 2), ((1, 4), 2),
+                          ((1, 5), 1)]:
+        stuff.clear()
+        click(text, index)
+        assert stuff == [result]
+
+
+def test_links_after_editing():
+    text = tk.Text(tk.Window())
+    stuff = []
+    for number in range(3):
+        links.add_function_link(
+            text, 'link%d' % number, functools.partial(stuff.append, number))
+    assert text.get() == 'link0link1link2'
+
+    text.insert((1, 0), 'hello ')
+    text.insert((1, 11), ' ')       # between link0 and link1
+    text.delete((1, 12), (1, 17))   # delete link1
+    assert text.get() == 'hello link0 link2'
+
+    click(text, (1, 6))
+    click(text, (1, 12))
+    click(text, (1, 16))
+    assert stuff == [0, 2, 2]
+    assert len(text._link_functions) == 2
 
-    text.get_tag('teek-extras-link-1').bindings['<1>'].run(None)
-    text.get_tag('teek-extras-link-2').bindings['<1>'].run(None)
-    assert stuff == [1, 2]
+    # the inserted text doesn't become a part of a link
+    stuff.clear()
+    click(text, (1, 11))
+    click(text, (1, 0))
+    assert stuff == []
+
+    # the functions and marks of deleted links are forgotten
+    text.replace((1, 5), (1, 12), 'lol')
+    text.delete((1, 7), text.end)
+    assert text.get() == 'hellolo'
+    click(text, (1, 0))
+    assert stuff == []
+    assert not text._link_functions
+    assert not any(name.startswith('teek-extras-link-')
+                   for name in text.marks.keys())
+
+
+def test_many_links():
+    text = tk.Text(tk.Window())
+    stuff = []
+    for number in range(1000):
+        links.add_function_link(
+            text, 'x', functools.partial(stuff.append, number))
+    click(text, (1, 567))
+    assert stuff == [567]
+
+
+def test_pruning_when_adding_links():
+    text = tk.Text(tk.Window())
+    for number in range(150):
+        links.add_function_link(text, 'x', print)
+        text.delete((1, 0), text.end)
+    assert len(text._link_functions) < 150
+    assert len(text.marks.keys()) < 2 * 150
 
 
 def test_links_cursor_changes():
@@ -48,5 +112,5 @@ def test_add_url_link(monkeypatch, handy_callback):
 
     text = tk.Text(tk.Window())
     links.add_url_link(text, 'asd', URL)
-    text.get_tag('teek-extras-link-1').bindings['<1>'].run(None)
+    click(text, (1, 1))
     assert stuff == [URL]
@@ -0,0 +1,70 @@
+
+import pytest
+
+import teek as tk
+from teek.extras.virtual_text import FileLines, VirtualTextView
+
+
+def test_file_lines(tmp_path):
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(b'hello\nworld\r\n\n\xc3\xb6\n')
+
+    with FileLines(str(path)) as lines:
+        assert len(lines) == 4
+        assert list(lines) == ['hello', 'world', '', '\xf6']
+        assert lines[-1] == '\xf6'
+        assert lines[1:3] == ['world', '']
+        assert lines[3:1] == []
+        assert lines[::2] == ['hello', '']
+        with pytest.raises(IndexError):
+            lines[4]
+
+    path.write_bytes(b'no newline at end')
+    with FileLines(str(path)) as lines:
+        assert list(lines) == ['no newline at end']
+
+    path.write_bytes(b'')
+    with FileLines(str(path)) as lines:
+        assert len(lines) == 0
+        assert lines[:] == []
+
+
+def test_virtual_text_view(run_event_loop):
+    lines = ['line %d' % number for number in range(100000)]
+    view = VirtualTextView(tk.Window(), lines, margin=10, height=5)
+    view.pack()
+    text = view.textwidget
+
+    assert view.first_line == 0
+    assert text.get_lines(1, 2) == ['line 0', 'line 1']
+    assert text.line_count < 100
+
+    view.scrollbar.config['command'].run('moveto', 0.5)
+    assert view.first_line == 50000
+    assert 'line 50000' in text.get_lines()
+    assert text.line_count < 100
+    first, last = view.scrollbar.get()
+    assert first == pytest.approx(0.5)
+
+    view.see(99999)     # can't scroll to show only the last line
+    assert view.first_line > 99900
+    assert text.get_lines()[-1] == 'line 99999'
+
+    for junk in range(30):
+        view.scrollbar.config['command'].run('scroll', -1, 'units')
+        run_event_loop(10)
+    assert view.first_line < 99900
+    assert 'line %d' % view.first_line in text.get_lines()
+
+    lines.append('new line')
+    view.refresh()
+    view.see(len(lines))
+    assert text.get_lines()[-1] == 'new line'
+
+    view.lines = []
+    assert view.first_line == 0
+    assert text.get() == ''
+    assert view.scrollbar.get() == (0.0, 1.0)
+
+    with pytest.raises(ValueError):
+        VirtualTextView(tk.Window(), [], wrap='word')
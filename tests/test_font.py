@@ -83,10 +83,80 @@ def test_properties():
     named_font.delete()
 
 
+def test_actual_and_caching():
+    named_font = tk.NamedFont(family='Helvetica', size=42, weight='bold')
+    actual = named_font.actual()
+    assert set(actual.keys()) == {'family', 'size', 'weight', 'slant',
+                                  'underline', 'overstrike'}
+    assert actual['size'] == named_font.size == 42
+    assert actual['weight'] == named_font.weight == 'bold'
+    assert actual['underline'] is named_font.underline is False
+
+    # changing the returned dict doesn't break anything
+    actual['size'] = 123
+    assert named_font.actual()['size'] == 42
+
+    # changing the font with teek clears the cache
+    named_font.size = 20
+    assert named_font.size == 20
+    assert tk.NamedFont(named_font.to_tcl(), size=21).size == 21
+    assert named_font.size == 21
+
+    # changing the font without teek, the cache is cleared when tk says
+    # that something changed
+    tk.tcl_call(None, 'font', 'configure', named_font, '-size', 22)
+    tk.tcl_call(None, 'event', 'generate', '.', '<<TkWorldChanged>>')
+    assert named_font.size == 22
+    assert named_font.metrics() == tk.Font(named_font.to_tcl()).metrics()
+
+    named_font.delete()
+
+
+def test_world_changed_binding_and_quitting():
+    def binding_commands():
+        return tk.tcl_call(str, 'bind', '.', '<<TkWorldChanged>>').count(
+            'teek_command_')
+
+    tk.Font('Helvetica 12').actual()
+    tk.Font('Helvetica 13').actual()
+    assert binding_commands() == 1
+    tk.quit()
+
+    # a new tcl interpreter gets a new binding
+    named_font = tk.NamedFont(family='Helvetica', size=10)
+    assert named_font.size == 10
+    assert binding_commands() == 1
+    tk.tcl_call(None, 'font', 'configure', named_font, '-size', 11)
+    tk.tcl_call(None, 'event', 'generate', '.', '<<TkWorldChanged>>')
+    assert named_font.size == 11
+    named_font.delete()
+
+
 def test_measure():
     assert tk.Font(('Helvetica', 42, 'bold')).measure('') == 0
 
 
+def test_measure_many():
+    font = tk.Font(('Helvetica', 42, 'bold'))
+    strings = ['', 'a', 'hello', 'hello world', '-displayof', 'a']
+    widths = [tk.tcl_call(int, 'font', 'measure', font, '-displayof', '.',
+                          string) for string in strings]
+    assert font.measure_many(strings) == widths
+    assert font.measure_many(iter(strings)) == widths
+    assert font.measure_many(strings, cache=True) == widths
+    assert font.measure_many(strings, cache=True) == widths
+    assert font.measure('-d') > 0
+    assert font.measure('hello', cache=True) == widths[2]
+    assert font.measure_many([]) == []
+
+    # the cache is cleared when the font changes
+    named_font = tk.NamedFont(family='Helvetica', size=10)
+    small = named_font.measure('hello', cache=True)
+    named_font.size = 40
+    assert named_font.measure('hello', cache=True) > small
+    named_font.delete()
+
+
 def test_metrics():
     metrics = tk.Font(('Helvetica', 42, 'bold')).metrics()
     assert isinstance(metrics['ascent'], int)
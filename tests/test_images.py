@@ -1,3 +1,4 @@
+import base64
 import os
 import random
 import tempfile
@@ -48,7 +49,7 @@ def test_config(check_config_types):
 
 
 @pytest.mark.slow
-def test_data_base64():
+def test_data_binary():
     with open(SMILEY_PATH, 'rb') as file:
         binary_data = file.read()
 
@@ -56,6 +57,14 @@ def test_data_base64():
                                  tk.Image(data=binary_data))
 
 
+def test_data_base64_string():
+    with open(SMILEY_PATH, 'rb') as file:
+        base64_data = base64.b64encode(file.read()).decode('ascii')
+
+    assert (tk.Image(data=base64_data).get_pixels() ==
+            tk.Image(file=SMILEY_PATH).get_pixels())
+
+
 @pytest.mark.slow
 def test_from_to_tcl():
     image1 = tk.Image(file=SMILEY_PATH)
@@ -162,3 +171,118 @@ def test_write():
         image1.write(asd, format='gif')
         image2 = tk.Image(file=asd)
     assert slow_content_eq_check(image1, image2)
+
+
+def test_get_pixels():
+    image = tk.Image(file=SMILEY_PATH)
+    pixels = image.get_pixels()
+    assert len(pixels) == 32 * 32 * 3
+
+    for x, y in [(0, 0), (31, 31), (random.randint(0, 31),
+                                    random.randint(0, 31))]:
+        offset = (y * 32 + x) * 3
+        color = image.get(x, y)
+        assert tuple(pixels[offset:offset + 3]) == (
+            color.red, color.green, color.blue)
+
+    region = image.get_pixels((10, 5, 13, 7))
+    row5 = 5 * 32 * 3
+    row6 = 6 * 32 * 3
+    assert region == (pixels[row5 + 10 * 3:row5 + 13 * 3] +
+                      pixels[row6 + 10 * 3:row6 + 13 * 3])
+    assert image.get_pixels((10, 10, 10, 20)) == b''
+
+    with pytest.raises(ValueError):
+        image.get_pixels((10, 10, 5, 20))
+
+
+def test_get_pixels_alpha():
+    image = tk.Image(file=SMILEY_PATH)
+    image.transparency_set(1, 0, True)
+    rgba = image.get_pixels((0, 0, 3, 1), alpha=True)
+    rgb = image.get_pixels((0, 0, 3, 1))
+    assert rgba[0::4] == rgb[0::3]
+    assert rgba[1::4] == rgb[1::3]
+    assert rgba[2::4] == rgb[2::3]
+    assert rgba[3::4] == b'\xff\x00\xff'
+
+
+def test_put_pixels():
+    image = tk.Image()
+    rgb = bytes([0, 0, 0, 255, 0, 0,
+                 0, 255, 0, 0, 0, 255])
+    image.put_pixels(rgb, 2, 2)
+    assert (image.width, image.height) == (2, 2)
+    assert image.get(1, 0) == tk.Color(255, 0, 0)
+    assert image.get_pixels() == rgb
+
+    # any buffer works, and the image grows as needed
+    image.put_pixels(bytearray(rgb), 2, 2, to=(2, 1))
+    image.put_pixels(memoryview(rgb)[:6], 2, 1, to=(0, 2))
+    assert (image.width, image.height) == (4, 3)
+    assert image.get_pixels((2, 1, 4, 3)) == rgb
+    assert image.get_pixels((0, 2, 2, 3)) == rgb[:6]
+
+    with pytest.raises(ValueError):
+        image.put_pixels(rgb, 3, 2)
+
+
+def test_put_pixels_alpha():
+    image = tk.Image()
+    rgba = bytes([1, 2, 3, 255, 4, 5, 6, 0,
+                  7, 8, 9, 255, 10, 11, 12, 255])
+    image.put_pixels(rgba, 2, 2, alpha=True)
+    assert image.transparency_get(1, 0) is True
+    assert image.transparency_get(0, 0) is False
+    assert image.get_pixels(alpha=True) == rgba
+    assert image.get_pixels() == bytes([1, 2, 3, 4, 5, 6,
+                                        7, 8, 9, 10, 11, 12])
+
+
+@pytest.mark.slow
+def test_pixels_big_image():
+    image = tk.Image(file=SMILEY_PATH)
+    big = tk.Image()
+    big.copy_from(image, zoom=20)
+    pixels = big.get_pixels()
+    assert len(pixels) == 640 * 640 * 3
+
+    copy = tk.Image()
+    copy.put_pixels(pixels, 640, 640)
+    assert copy.get_pixels() == pixels
+
+
+def test_numpy_arrays():
+    numpy = pytest.importorskip('numpy')
+
+    image = tk.Image(file=SMILEY_PATH)
+    array = image.to_array()
+    assert array.shape == (32, 32, 3)
+    assert array.dtype == numpy.uint8
+    assert array.tobytes() == image.get_pixels()
+    array[0, 0] = [1, 2, 3]     # the array is writable
+
+    color = image.get(5, 10)
+    assert list(array[10, 5]) == [color.red, color.green, color.blue]
+    assert image.to_array((5, 10, 7, 13)).shape == (3, 2, 3)
+
+    image2 = tk.Image.from_array(array)
+    assert (image2.width, image2.height) == (32, 32)
+    assert image2.get(0, 0) == tk.Color(1, 2, 3)
+    assert image2.get_pixels() == array.tobytes()
+
+    # not contiguous
+    image3 = tk.Image.from_array(array[::2, ::2])
+    assert image3.get_pixels() == array[::2, ::2].tobytes()
+
+    rgba = numpy.zeros((2, 3, 4), dtype=numpy.uint8)
+    rgba[0, 1] = [10, 20, 30, 255]
+    image4 = tk.Image.from_array(rgba)
+    assert image4.transparency_get(0, 0) is True
+    assert image4.transparency_get(1, 0) is False
+    assert (image4.to_array(alpha=True) == rgba).all()
+
+    with pytest.raises(ValueError):
+        tk.Image.from_array(array.astype(numpy.float64))
+    with pytest.raises(ValueError):
+        tk.Image.from_array(array[:, :, :2])
@@ -124,6 +124,34 @@ def test_colors():
         the_dict[white]
 
 
+def test_color_parsing_and_caching(monkeypatch):
+    assert tk.Color('#12345678abcd') == tk.Color(0x12, 0x56, 0xab)
+    assert tk.Color('#AbCdEf') == tk.Color(0xab, 0xcd, 0xef)
+    assert tk.Color('#fff') == tk.Color('#fff')
+    for string in ['#ff000', '#+12345', '#ggg', 'no such color']:
+        with pytest.raises(tk.TclError):
+            tk.Color(string)
+
+    # tk's interpretation of these is cached, and hex colors are parsed in
+    # python, so creating these again doesn't call tk at all
+    tk.Color('#123')
+    tk.Color('snow')
+
+    def fake_tcl_call(*args):
+        raise AssertionError("tcl_call(*%r) was called" % (args,))
+
+    monkeypatch.setattr(tk, 'tcl_call', fake_tcl_call)
+    assert tk.Color(1, 2, 3).red == 1
+    assert tk.Color('#abcdef').green == 0xcd
+    assert tk.Color('snow') == tk.Color('snow')
+    assert tk.Color('#123').blue == tk.Color('#123').blue
+
+    # from_tcl() returns the same object for the same string
+    assert tk.Color.from_tcl('snow') is tk.Color.from_tcl('snow')
+    assert tk.Color.from_tcl('#ff0000') is tk.Color.from_tcl('#ff0000')
+    assert tk.Color.from_tcl('#ff0000') is not tk.Color.from_tcl('red')
+
+
 def test_screen_distances():
     assert tk.ScreenDistance(123).pixels == 123
     assert tk.ScreenDistance('123').pixels == 123
@@ -164,3 +192,22 @@ def test_screen_distances():
 
     with pytest.raises(tk.TclError):
         tk.ScreenDistance('asdf asdf')
+
+
+def test_screen_distance_local_conversion(monkeypatch):
+    values = ['12', '-1.5', '2.5', '1c', '1.5i', ' 2 m ', '10p', '.5c',
+              '1e1p', '-3i']
+    for value in values:
+        distance = tk.ScreenDistance(value)
+        assert distance.pixels == tk.tcl_call(int, 'winfo', 'pixels', '.',
+                                              value)
+        assert round(distance.fpixels, 6) == round(
+            tk.tcl_call(float, 'winfo', 'fpixels', '.', value), 6)
+
+    def fake_tcl_call(*args):
+        raise AssertionError("tcl_call(*%r) was called" % (args,))
+
+    monkeypatch.setattr(tk, 'tcl_call', fake_tcl_call)
+    for value in values:
+        tk.ScreenDistance(value).pixels
+        tk.ScreenDistance.from_tcl(value).fpixels
@@ -68,3 +68,305 @@ def test_cancel():
     tk.after(50, try_to_cancel_the_completed_timeout)
     tk.after(100, tk.quit)
     tk.run()
+
+
+def test_no_tcl_commands_created():
+    def command_count():
+        return len(tk.tcl_call([str], 'info', 'commands', 'teek_command_*'))
+
+    tk.after_idle(lambda: None)     # may create the dispatcher command
+    old_count = command_count()
+
+    stuff = []
+    timeouts = [tk.after_idle(stuff.append, [i]) for i in range(100)]
+    timeouts += [tk.after(10, stuff.append, [i]) for i in range(100, 200)]
+    assert command_count() == old_count
+    for timeout in timeouts[::2]:
+        timeout.cancel()
+
+    tk.after(50, tk.quit)
+    tk.run()
+    assert stuff == list(range(1, 200, 2))
+
+
+@pytest.mark.slow
+def test_every(run_event_loop):
+    times = []
+    timeout = tk.every(20, lambda: times.append(time.monotonic()))
+    assert repr(timeout).startswith("<repeating '<lambda>' timeout")
+    start = time.monotonic()
+    run_event_loop(210)
+    timeout.cancel()
+    assert repr(timeout).startswith("<cancelled '<lambda>' timeout")
+    run_event_loop(50)
+
+    assert 9 <= len(times) <= 11
+    # no drift: the n'th run happens about n*20ms after starting
+    assert times[-1] - start < len(times) * 0.020 + 0.015
+
+    with pytest.raises(RuntimeError) as error:
+        timeout.cancel()
+    assert str(error.value) == "cannot cancel a cancelled timeout"
+
+
+@pytest.mark.slow
+def test_every_cancel_in_callback_and_errors(capsys, run_event_loop):
+    ran = []
+
+    def callback():
+        ran.append(1)
+        if len(ran) == 3:
+            timeout.cancel()
+        raise ValueError("oh no")
+
+    timeout = tk.every(10, callback)
+    run_event_loop(100)
+    assert len(ran) == 3
+
+    output, errors = capsys.readouterr()
+    assert not output
+    assert errors.count("ValueError: oh no") == 3
+    assert "timeout = tk.every(10, callback)" in errors
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('skip_missed', [True, False])
+def test_every_missed(skip_missed, run_event_loop):
+    ran = []
+    timeout = tk.every(10, ran.append, [1], skip_missed=skip_missed)
+    time.sleep(0.1)     # block the event loop, about 10 runs are missed
+    run_event_loop(15)
+    timeout.cancel()
+
+    if skip_missed:
+        assert 1 <= len(ran) <= 3
+    else:
+        assert len(ran) >= 10
+
+
+@pytest.mark.slow
+def test_every_align(run_event_loop):
+    times = []
+    timeout = tk.every(50, lambda: times.append(time.time()), align=True)
+    run_event_loop(160)
+    timeout.cancel()
+
+    assert times
+    for value in times:
+        assert value % 0.05 < 0.015
+
+
+def test_every_bad_interval():
+    with pytest.raises(ValueError):
+        tk.every(0, print)
+
+
+@pytest.mark.slow
+def test_debounce(run_event_loop):
+    ran = []
+
+    @tk.debounce(30)
+    def func(*args):
+        ran.append(args)
+
+    assert func.__name__ == 'func'
+    for i in range(5):
+        assert func(i, 'lol') is None
+        run_event_loop(10)
+    assert ran == []
+    run_event_loop(50)
+    assert ran == [(4, 'lol')]
+
+    func('cancelled')
+    func.cancel()
+    run_event_loop(50)
+    assert ran == [(4, 'lol')]
+
+
+def test_debounce_method(run_event_loop):
+    class Thing:
+        def __init__(self, name):
+            self.name = name
+            self.ran = []
+
+        @tk.debounce(10)
+        def func(self, arg):
+            self.ran.append((self.name, arg))
+
+    a = Thing('a')
+    b = Thing('b')
+    assert a.func is a.func
+    assert a.func is not b.func
+    assert a.func.__name__ == 'func'
+
+    a.func(1)
+    b.func(2)
+    a.func(3)
+    run_event_loop(50)
+    assert a.ran == [('a', 3)]
+    assert b.ran == [('b', 2)]
+
+
+@pytest.mark.slow
+def test_throttle(run_event_loop):
+    ran = []
+    func = tk.throttle(30)(ran.append)
+
+    for i in range(10):
+        func(i)
+        run_event_loop(10)
+    run_event_loop(50)
+
+    # the first call runs right away, then about every third call, and the
+    # last call runs at the end
+    assert ran[0] == 0
+    assert ran[-1] == 9
+    assert 3 <= len(ran) <= 6
+
+
+def test_debounce_with_callback_and_bindings(run_event_loop):
+    ran = []
+    callback = tk.Callback()
+    callback.connect(tk.debounce(1)(ran.append))
+    assert callback.run('a') is None
+    assert callback.run('b') is None
+
+    window = tk.Window()
+    window.bind('<<Thingy>>', tk.throttle(1000)(ran.append), event=True)
+    window.event_generate('<<Thingy>>', data='hello')
+    run_event_loop(30)
+    assert ran[0].data(str) == 'hello'
+    assert ran[1:] == ['b']
+
+
+def test_after_idle_uses_one_tcl_idle_handler(run_event_loop):
+    run_event_loop(10)
+    old_after_ids = set(tk.tcl_call([str], 'after', 'info'))
+
+    stuff = []
+    timeouts = [tk.after_idle(stuff.append, [i]) for i in range(100)]
+    assert len(set(tk.tcl_call([str], 'after', 'info')) - old_after_ids) == 1
+
+    timeouts[3].cancel()
+    assert repr(timeouts[3]).startswith("<cancelled 'append' timeout")
+    run_event_loop(10)
+    assert stuff == [i for i in range(100) if i != 3]
+
+
+@pytest.mark.slow
+def test_after_idle_time_budget(run_event_loop):
+    ran = []
+
+    def slow_callback(i):
+        ran.append(i)
+        time.sleep(0.015)
+        if i == 0:
+            tk.after(0, ran.append, ['timer'])
+
+    for i in range(5):
+        tk.after_idle(slow_callback, [i])
+    run_event_loop(200)
+
+    # the timer ran before all the slow callbacks were done
+    assert ran.index('timer') < 5
+    ran.remove('timer')
+    assert ran == list(range(5))
+
+
+def test_update_in_after_idle_callback(capsys, run_event_loop):
+    ran = []
+
+    def updating_callback():
+        ran.append('updating')
+        tk.after_idle(ran.append, ['added'])
+        tk.update()
+
+    tk.after_idle(updating_callback)
+    tk.after_idle(ran.append, ['second'])
+    run_event_loop(50)
+
+    # the update runs the rest of the queue
+    assert ran == ['updating', 'second', 'added']
+    assert capsys.readouterr() == ('', '')
+
+
+def test_spawn(run_event_loop):
+    log = []
+
+    def generator():
+        try:
+            for i in range(50):
+                log.append(i)
+                if i == 0:
+                    tk.after(0, log.append, ['timer'])
+                time.sleep(0.001)
+                yield
+            return 'the result'
+        finally:
+            log.append('finally')
+
+    task = tk.spawn(generator(), budget_ms=5)
+    assert repr(task).startswith("<running 'generator' task")
+    task.on_done.connect(lambda task: log.append(task.state))
+    assert log == []      # nothing runs before the event loop does
+
+    run_event_loop(200)
+
+    # the generator ran in many pieces, and tk did other things in between
+    assert log.index('timer') < 50
+    log.remove('timer')
+    assert log == list(range(50)) + ['finally', 'completed']
+    assert task.result == 'the result'
+    assert task.time_used >= 0.05
+    assert repr(task).startswith("<completed 'generator' task")
+
+    with pytest.raises(RuntimeError) as error:
+        task.cancel()
+    assert str(error.value) == "cannot cancel a completed task"
+
+
+def test_spawn_cancel(capsys, run_event_loop):
+    log = []
+
+    def generator():
+        try:
+            while True:
+                log.append('step')
+                yield
+        finally:
+            log.append('finally')
+
+    task = tk.spawn(generator())
+    task.on_done.connect(log.append)
+    task.cancel()
+    assert log == [task]
+    run_event_loop(20)
+    assert log == [task]
+    assert task.state == 'cancelled'
+
+    def self_cancelling():
+        yield
+        task.cancel()
+        yield
+        log.append('this should not run')
+
+    log.clear()
+    task = tk.spawn(self_cancelling())
+    task.on_done.connect(log.append)
+    run_event_loop(20)
+    assert log == [task]
+    assert task.state == 'cancelled'
+
+    def failing():
+        yield
+        raise ValueError("oh no")
+
+    task = tk.spawn(failing())
+    run_event_loop(20)
+    assert task.state == 'failed'
+    assert task.result is None
+
+    output, errors = capsys.readouterr()
+    assert not output
+    assert errors.endswith("ValueError: oh no\n")
+    assert "task = tk.spawn(failing())" in errors
@@ -354,6 +354,44 @@ def test_config_types(check_config_types, all_widgets):
         check_config_types(widget.config, type(widget).__name__)
 
 
+def test_shared_config_types():
+    label1 = tk.Label(tk.Window())
+    label2 = tk.Label(tk.Window())
+    assert label1.config._types._dict is label2.config._types._dict
+    assert label1.config._types['text'] is str
+
+    # changing the types of one widget must not affect other widgets
+    label1.config._types['text'] = int
+    assert label1.config._types['text'] is int
+    assert label2.config._types['text'] is str
+    assert tk.Label(tk.Window()).config._types['text'] is str
+
+
+@pytest.mark.slow
+def test_memory_usage():
+    # creating many widgets and text tags must not use lots of memory for
+    # storing the same option types many times
+    tracemalloc = pytest.importorskip('tracemalloc')
+    window = tk.Window()
+    text = tk.Text(window)
+    tk.Label(window)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tags = [text.get_tag('tag%d' % number) for number in range(1000)]
+        per_tag = (tracemalloc.get_traced_memory()[0] - before) / len(tags)
+
+        before = tracemalloc.get_traced_memory()[0]
+        labels = [tk.Label(window) for junk in range(300)]
+        per_label = (tracemalloc.get_traced_memory()[0] - before) / len(labels)
+    finally:
+        tracemalloc.stop()
+
+    assert per_tag < 1000       # was about 1600 with a dict for each tag
+    assert per_label < 4000
+
+
 def test_from_tcl():
     window = tk.Window()
     widget_path = window.to_tcl()
@@ -214,6 +214,22 @@ def test_marks():
     assert text.marks['before space'] == text.start.forward(chars=5)
     del text.marks['before space']
     assert 'before space' not in text.marks
+    with pytest.raises(KeyError):
+        text.marks['before space']
+
+    # mark names that look like indexes must not be treated as indexes
+    with pytest.raises(KeyError):
+        text.marks['1.0']
+    text.marks['end + 1 char'] = (1, 3)
+    assert text.marks['end + 1 char'] == (1, 3)
+
+    text.marks['lol'] = (1, 2)
+    assert text.marks.snapshot() == {
+        'insert': text.end,     # moved by the insert
+        'current': text.start,
+        'end + 1 char': (1, 3),
+        'lol': (1, 2),
+    }
 
 
 def test_scrolling():
@@ -242,3 +258,345 @@ def test_scrolling():
     pair = text.yview()
     assert isinstance(pair, tuple) and len(pair) == 2
     assert all(isinstance(item, float) for item in pair)
+
+
+def test_dump():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'hello\nworld')
+    tag = text.get_tag('asd')
+    tag.add((1, 2), (2, 3))
+    text.marks['lol'] = (2, 0)
+
+    result = text.dump()
+    assert ('text', 'he', (1, 0)) in result
+    assert ('tagon', tag, (1, 2)) in result
+    assert ('tagoff', tag, (2, 3)) in result
+    assert ('mark', 'lol', (2, 0)) in result
+    assert all(isinstance(index, text.TextIndex) for kind, value, index
+               in result)
+    assert ''.join(value for kind, value, index in result
+                   if kind == 'text') == text.get()
+
+    assert [kind for kind, value, index in text.dump(kinds=['tag'])] == [
+        'tagon', 'tagoff']
+    assert text.dump((1, 0), (1, 2), kinds=['text']) == [
+        ('text', 'he', (1, 0))]
+    assert text.dump(kinds=[]) == []
+
+
+def test_search_all_and_highlight_all():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'toot asd Toot\ntoot')
+
+    assert text.search_all('toot') == [((1, 0), (1, 4)), ((2, 0), (2, 4))]
+    assert text.search_all('toot', nocase=True) == [
+        ((1, 0), (1, 4)), ((1, 9), (1, 13)), ((2, 0), (2, 4))]
+    assert text.search_all('toot', (1, 1)) == [((2, 0), (2, 4))]
+    assert text.search_all('toot', (1, 0), (1, 10)) == [((1, 0), (1, 4))]
+    assert text.search_all('a.d|o+', regexp=True) == [
+        ((1, 1), (1, 3)), ((1, 5), (1, 8)), ((1, 10), (1, 12)),
+        ((2, 1), (2, 3))]
+    assert text.search_all('lol') == []
+    for index in itertools.chain.from_iterable(text.search_all('toot')):
+        assert isinstance(index, text.TextIndex)
+
+    tag = text.get_tag('found')
+    assert text.highlight_all(tag, 'toot', nocase=True) == tag.ranges()
+    assert len(tag.ranges()) == 3
+    assert text.highlight_all('found', 'lol') == []
+    assert len(tag.ranges()) == 3
+
+
+def test_search_all_elided_text_and_embedded_windows():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'axb abc')
+    text.get_tag('hidden')['elide'] = True
+    text.get_tag('hidden').add((1, 1), (1, 2))
+    text._call(None, text, 'window', 'create', '1.5',
+               '-window', tk.Label(text))
+
+    # matching ignores the hidden x and the window
+    assert text.search_all('ab') == [((1, 0), (1, 3)), ((1, 4), (1, 7))]
+
+
+def test_add_ranges_remove_ranges():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'abcdefg\nhijklmn')
+    tag = text.get_tag('asd')
+
+    tag.add_ranges([((1, 0), (1, 2)), ((1, 4), (1, 5)), ((2, 1), (100, 100))])
+    assert tag.ranges() == [((1, 0), (1, 2)), ((1, 4), (1, 5)),
+                            ((2, 1), text.end)]
+
+    tag.remove_ranges(iter([((1, 1), (1, 4)), ((2, 0), (2, 3))]))
+    assert tag.ranges() == [((1, 0), (1, 1)), ((1, 4), (1, 5)),
+                            ((2, 3), text.end)]
+
+    # these must not do anything
+    tag.add_ranges([])
+    tag.remove_ranges([])
+    assert len(tag.ranges()) == 3
+
+    with pytest.raises(TypeError):
+        tag.add_ranges([('1.0', '1.2')])
+    with pytest.raises(ValueError):
+        tag.add_ranges([((1, 0), (1, 2), (1, 3))])
+
+
+def test_on_change():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'hello')
+    changes = []
+    text.on_change.connect(changes.append)
+    assert text.on_change is text.on_change
+
+    text.insert(text.end, ' world\nlol')
+    text.delete((1, 0), (1, 6))
+    text.replace((1, 0), (1, 5), 'wat')
+    text.delete((1, 0), (1, 0))     # does nothing
+    text.insert(text.start, '')     # does nothing
+    assert changes == [
+        ('insert', (1, 5), (1, 5), ' world\nlol'),
+        ('delete', (1, 0), (1, 6), ''),
+        ('replace', (1, 0), (1, 5), 'wat'),
+    ]
+    assert all(isinstance(index, text.TextIndex) for change in changes
+               for index in [change.start, change.end])
+    assert changes[0].kind == 'insert'
+    assert changes[0].new_text == ' world\nlol'
+    changes.clear()
+
+    # tcl code that doesn't go through teek, and tk's bindings
+    tk.tcl_call(None, text, 'insert', 'end', '!')
+    tk.tcl_call(None, text, 'delete', '1.0')
+    tk.tcl_call(None, 'tk::TextInsert', text, 'x')
+    assert changes == [
+        ('insert', (2, 3), (2, 3), '!'),
+        ('delete', (1, 0), (1, 1), ''),
+        ('insert', (1, 0), (1, 0), 'x'),
+    ]
+    assert text.get() == 'xat\nlol!'
+    changes.clear()
+
+    # other things still work, including errors
+    assert text.marks['insert'] == (1, 1)
+    with pytest.raises(tk.TclError):
+        tk.tcl_call(None, text, 'insert', 'asdasd', 'lol')
+    assert 'teek_change_last' not in text.marks
+
+    text.config['state'] = 'disabled'
+    tk.tcl_call(None, text, 'delete', '1.0', 'end')
+    text.config['state'] = 'normal'
+    assert changes == []
+
+    text.config['undo'] = True
+    text.insert(text.end, 'boo')
+    tk.tcl_call(None, text, 'edit', 'undo')
+    assert changes[-1] == ('replace', text.start, (2, 7), 'xat\nlol!')
+
+    text.destroy()
+    assert not tk.tcl_call([str], 'info', 'commands', text.to_tcl() + '*')
+
+
+def test_load_stream(tmp_path):
+    path = tmp_path / 'big.txt'
+    path.write_text('hello %d\n' * 1000 % tuple(range(1000)))
+
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'start end')
+    progress = []
+    with path.open() as file:
+        loader = text.load_stream(file, (1, 6), chunk_size=100, budget_ms=0)
+        loader.on_progress.connect(progress.append)
+        assert text.get() == 'start end'     # nothing loaded yet
+        assert repr(loader) == '<loading stream loader: 0 characters loaded>'
+
+        done = []
+        loader.on_done.connect(done.append, args=[True])
+        while not done:
+            tk.update()
+
+    assert text.get() == 'start ' + path.read_text() + 'end'
+    assert len(progress) > 10
+    assert progress == sorted(progress)
+    assert progress[-1] == loader.characters_loaded == len(path.read_text())
+    assert repr(loader).startswith('<successfully completed stream loader')
+    assert not any(mark.startswith('teek_load_stream') for mark in text.marks)
+
+    with pytest.raises(RuntimeError) as error:
+        loader.cancel()
+    assert str(error.value) == (
+        "cannot cancel a successfully completed stream loader")
+
+
+def test_load_stream_iterable_and_cancel():
+    text = tk.Text(tk.Window())
+    loader = text.load_stream(('line %d\n' % i for i in range(100)),
+                              tag_list=['asd'], chunk_size=20, budget_ms=0)
+
+    def on_progress(count):
+        if count >= 50:
+            loader.cancel()
+
+    loader.on_progress.connect(on_progress)
+    while repr(loader).startswith('<loading'):
+        tk.update()
+
+    assert 50 <= loader.characters_loaded < 100
+    assert text.get() == ''.join('line %d\n' % i for i in range(100))[
+        :loader.characters_loaded]
+    assert text.get_tag('asd').ranges() == [(text.start, text.end)]
+    assert repr(loader).startswith('<cancelled stream loader')
+
+
+def test_set_content():
+    text = tk.Text(tk.Window())
+    text.insert(text.end, 'a\nb\nc\nd')
+    text.marks['lol'] = (4, 0)
+    changes = []
+    text.on_change.connect(changes.append)
+
+    text.set_content('a\nb\nc\nd')
+    assert changes == []
+
+    text.set_content('a\nx\nc\nd\ne\nf')
+    assert text.get() == 'a\nx\nc\nd\ne\nf'
+    assert len(changes) == 2
+    assert text.marks['lol'] == (4, 0)      # wasn't touched
+
+    text.set_content('c\nd')
+    assert text.get() == 'c\nd'
+    text.set_content('')
+    assert text.get() == ''
+    text.set_content('hello\nworld')
+    assert text.get() == 'hello\nworld'
+
+    changes.clear()
+    text.set_content('lol', strategy='replace')
+    assert text.get() == 'lol'
+    assert changes == [('replace', (1, 0), (2, 5), 'lol')]
+
+    with pytest.raises(ValueError):
+        text.set_content('wat', strategy='asd')
+
+
+def test_create_peer():
+    window = tk.Window()
+    text = tk.Text(window)
+    text.insert(text.end, 'hello\nworld')
+    peer = text.create_peer(window, height=3)
+    assert isinstance(peer, tk.Text)
+    assert peer.get() == 'hello\nworld'
+    assert peer.config['height'] == 3
+
+    peer.insert(peer.end, '!')
+    assert text.get() == 'hello\nworld!'
+
+    text.get_tag('bold').add((1, 0), (1, 5))
+    assert peer.get_tag('bold').ranges() == [((1, 0), (1, 5))]
+    assert peer.get_tag('bold') == text.get_tag('bold')
+    assert peer.get_tag('sel') != text.get_tag('sel')
+    assert tk.Text(window).get_tag('bold') != text.get_tag('bold')
+
+    changes = []
+    text.on_change.connect(changes.append)
+    peer.delete((1, 0), (2, 0))
+    text.insert(text.start, 'a')
+    peer2 = peer.create_peer(window)
+    peer2.insert(peer2.end, 'b')
+    assert changes == [
+        ('delete', (1, 0), (2, 0), ''),
+        ('insert', (1, 0), (1, 0), 'a'),
+        ('insert', (1, 7), (1, 7), 'b'),
+    ]
+    assert peer.on_change is text.on_change
+
+
+def test_peer_tags_and_destroying():
+    window = tk.Window()
+    text = tk.Text(window)
+    text.insert(text.end, 'a\nb\nc\nd')
+    peer = tk.Text(window, peer_of=text, startline=3)
+    assert peer.get() == 'c\nd'
+    assert peer.get_tag('bold') == text.get_tag('bold')
+    assert peer.get_tag('sel') != text.get_tag('sel')
+
+    # the peer's tag objects use the peer's line numbers
+    peer.get_tag('bold').add((1, 0), (1, 1))
+    assert text.get_tag('bold').ranges() == [((3, 0), (3, 1))]
+    assert peer.get_tag('bold').ranges() == [((1, 0), (1, 1))]
+
+    # tk shares the bindings, so binding with one peer must not replace
+    # the other peer's binding
+    assert (text.get_tag('bold').bindings['<Button-1>'] is
+            peer.get_tag('bold').bindings['<Button-1>'])
+
+    # tk can destroy the widget without teek's destroy() method
+    tk.tcl_call(None, 'destroy', text)
+    assert text._shared.widgets == [peer]
+    assert len(peer.get_tag('bold').bindings) == 1
+    assert peer._shared.command_list
+
+    peer.destroy()
+    assert not peer._shared.widgets
+    assert not peer._shared.command_list
+
+
+def test_lines():
+    text = tk.Text(tk.Window())
+    assert text.line_count == 1
+    assert text.get_lines() == ['']
+
+    text.insert(text.end, 'a\nb\nc')
+    assert text.line_count == 3
+    assert text.get_lines() == ['a', 'b', 'c']
+    assert text.get_lines(2) == ['b', 'c']
+    assert text.get_lines(2, 2) == ['b']
+    assert text.get_lines(3, 1000) == ['c']
+    assert text.get_lines(4, 1000) == []
+    assert text.get_lines(2, 1) == []
+
+    text.replace_lines(2, 2, ['x', 'y'])
+    assert text.get() == 'a\nx\ny\nc'
+    text.replace_lines(1, 0, ['first'])
+    assert text.get() == 'first\na\nx\ny\nc'
+    text.replace_lines(6, 5, ['last'])
+    assert text.get() == 'first\na\nx\ny\nc\nlast'
+    text.replace_lines(5, 6, ['end'])
+    assert text.get() == 'first\na\nx\ny\nend'
+    text.replace_lines(4, 5, [])
+    assert text.get() == 'first\na\nx'
+    text.replace_lines(2, 2, [])
+    assert text.get() == 'first\nx'
+    text.replace_lines(1, 2, [])
+    assert text.get() == ''
+    text.replace_lines(2, 1, [])
+    assert text.get() == ''
+
+    with pytest.raises(ValueError):
+        text.replace_lines(0, 1, ['a'])
+    with pytest.raises(ValueError):
+        text.replace_lines(3, 1, ['a'])
+
+
+def test_line_count_with_on_change():
+    text = tk.Text(tk.Window())
+    text.on_change.connect(lambda change: None)
+    text.insert(text.end, 'a\nb\nc')
+    assert text.line_count == 3
+
+    text.insert((2, 0), 'x\ny\n')
+    text.delete((1, 0), (2, 0))
+    text.replace((1, 0), text.end, 'hello\nworld')
+    text.insert(text.end, '\n')
+    assert text.line_count == text.end.line == 3
+    text.delete(text.start, text.end)
+    assert text.line_count == text.end.line == 1
+
+    text.config['undo'] = True
+    text.insert(text.end, 'a\nb')
+    text._call(None, text, 'edit', 'separator')
+    text.insert(text.end, 'c\nd')
+    assert text.line_count == text.end.line == 3
+    text._call(None, text, 'edit', 'undo')
+    assert text.line_count == text.end.line == 2